@@ -1,6 +1,6 @@
 from setuptools import setup, find_packages
 
-VERSION = '0.7.2'
+VERSION = '0.8.0'
 DESCRIPTION = 'Connectors, model classes, utilities to be used within SmartForge-related Python projects.'
 LONG_DESCRIPTION = 'Connectors, model classes, utilities to be used within SmartForge-related Python projects.'
 
@@ -16,6 +16,7 @@ setup(
                       "cassandra-driver == 3.25.0",
                       "redis == 4.2.2",
                       "requests == 2.27.1"],
+    extras_require={"numpy": ["numpy"]},
     keywords=['smartforge', 'karlstad', 'university',
               'kau', 'bharat', 'forge', 'bf'],
     classifiers=[
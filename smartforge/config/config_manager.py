@@ -1,6 +1,16 @@
-from typing import List
+import json
+import os
+import threading
+from typing import Callable, List, Union
 
 from smartforge.connector import RedisConnector
+from smartforge.connector.redis_codec import RedisType
+from smartforge.utils import get_logger
+
+"""
+Logger
+"""
+logger = get_logger("ConfigManager")
 
 
 class NotConnectedException(Exception):
@@ -17,27 +27,82 @@ class IncompleteConfigException(Exception):
             "configurable properties."
 
 
-__expected_keys = [
+_expected_keys = [
     "hosts", "endpoints", "opc_tags"
 ]
 
 
 class ConfigManager:
-    def __init__(self, connector: RedisConnector):
+    """
+    Configuration stored in Redis as one JSON value per section (i.e., key).
+    """
+    def __init__(self,
+                 connector: RedisConnector,
+                 sections: Union[List[str], None] = None,
+                 watch: bool = False,
+                 refresh_interval: Union[float, None] = None,
+                 on_change: Union[Callable[[str], None], None] = None,
+                 snapshot_path: Union[str, None] = None,
+                 version_key: Union[str, None] = None):
+        """
+        Loads with a single JSON.MGET the expected sections (```hosts```, ```endpoints```, ```opc_tags```)
+        and the additional ```sections```.
+
+        With ```watch``` a section is loaded again as soon as it changes (keyspace notifications must be
+        enabled on the instance, see :class:`RedisConnector`). With ```refresh_interval``` all the sections
+        are loaded again (with a single JSON.MGET) every ```refresh_interval``` seconds.
+        ```on_change``` is called with the name of each section that changed after being loaded again.
+
+        With ```snapshot_path``` the configuration is saved to that file whenever it is loaded and, if the file
+        exists, it is loaded from there without waiting for Redis (nor requiring ```connector``` to be connected).
+        It is then validated in background, loading the configuration from Redis only if it changed:
+        that is when the value of ```version_key``` (to be updated by whoever changes the configuration)
+        differs from the one of the snapshot, or always if there is no ```version_key```.
+        Periodic refreshes are skipped as well while the value of ```version_key``` does not change.
+        """
         self._conn = connector
-        if not self._conn.is_connected:
-            raise NotConnectedException()
+        self._sections = list(dict.fromkeys(_expected_keys + (sections if sections is not None else [])))
+        self._snapshot_path = snapshot_path
+        self._version_key = version_key
+        self._version: Union[str, None] = None
+        self._lock = threading.RLock()
+        self._on_change = None
+        self._config = {}
 
-        self._keys = self._conn.keys()
-        for expected in __expected_keys:
-            if expected not in self._keys:
+        from_snapshot = snapshot_path is not None and self.__load_snapshot()
+        if not from_snapshot:
+            if not self._conn.is_connected:
+                raise NotConnectedException()
+            self.__update(self._sections, self.__read_version())
+        for expected in _expected_keys:
+            if expected not in self._config:
                 raise IncompleteConfigException()
-        
-        self._config = {k: self._conn.json_get(k) for k in self._keys}
+        self._on_change = on_change
+
+        self._watch_id = None
+        if watch:
+            self._watch_id = self._conn.watch_keys(self._sections, self.__on_notification)
+            if self._watch_id is None:
+                logger.error("The configuration cannot be watched.")
+
+        self._stop_refresh = threading.Event()
+        self._refresher = None
+        if from_snapshot or refresh_interval is not None:
+            self._refresher = threading.Thread(target=self.__refresh_periodically,
+                                               args=(from_snapshot, refresh_interval),
+                                               name="ConfigManager", daemon=True)
+            self._refresher.start()
+
+    @property
+    def version(self) -> Union[str, None]:
+        """
+        Returns the value of ```version_key``` when the configuration was loaded, ```None``` if unknown.
+        """
+        return self._version
 
     @property
     def configurable_properties(self) -> List[str]:
-        return self._keys
+        return list(self._config.keys())
 
     @property
     def configuration(self) -> dict:
@@ -53,4 +118,117 @@ class ConfigManager:
 
     @property
     def opc_tags(self) -> dict:
-        return self._config["opc_tags"]
\ No newline at end of file
+        return self._config["opc_tags"]
+
+    def close(self) -> None:
+        """
+        Stops loading again the configuration when it changes.
+        """
+        if self._watch_id is not None:
+            self._conn.unwatch_keys(self._watch_id)
+            self._watch_id = None
+        if self._refresher is not None:
+            self._stop_refresh.set()
+            self._refresher.join()
+            self._refresher = None
+
+    def __load(self, sections: List[str]) -> List[str]:
+        """
+        Loads ```sections``` with a single JSON.MGET, returns those that changed.
+        Sections missing from Redis (e.g., while being rewritten) keep their last loaded value.
+        """
+        changed: List[str] = list()
+        for section, value in zip(sections, self._conn.json_multiple_get(sections)):
+            if value is None:
+                if section in self._config:
+                    logger.warning(f"Section {section} not found, keeping its last loaded value.")
+            elif self._config.get(section) != value:
+                self._config[section] = value
+                changed.append(section)
+
+        return changed
+
+    def __read_version(self) -> Union[str, None]:
+        if self._version_key is None:
+            return None
+        return self._conn.get(self._version_key, RedisType.string)
+
+    def __update(self, sections: List[str], version: Union[str, None]) -> None:
+        """
+        Loads ```sections```, the version must be read before them (a newer configuration is then
+        at most saved with an older version, which is loaded again next time).
+        """
+        with self._lock:
+            changed = self.__load(sections)
+            self._version = version
+            if self._snapshot_path is not None and (len(changed) > 0 or len(sections) == len(self._sections)):
+                self.__save_snapshot()
+
+        if self._on_change is not None:
+            for section in changed:
+                self._on_change(section)
+
+    def __refresh(self) -> None:
+        """
+        Loads all the sections, unless the version did not change.
+        """
+        version = self.__read_version()
+        if version is not None and version == self._version:
+            return
+        self.__update(self._sections, version)
+
+    def __on_notification(self, section: Union[str, None]) -> None:
+        # None when changes may have been missed
+        if section is None:
+            self.__refresh()
+        else:
+            # The other sections may not be up to date with the current version yet
+            self.__update([section], self._version)
+
+    def __refresh_periodically(self, validate: bool, refresh_interval: Union[float, None]) -> None:
+        if validate:
+            self.__safe_refresh()
+        if refresh_interval is None:
+            return
+
+        while not self._stop_refresh.wait(refresh_interval):
+            self.__safe_refresh()
+
+    def __safe_refresh(self) -> None:
+        if not self._conn.is_connected:
+            logger.warning("Not connected to Redis, the configuration cannot be refreshed.")
+            return
+
+        try:
+            self.__refresh()
+        except Exception as exc:
+            logger.error(f"{type(exc)} while refreshing the configuration.")
+
+    def __load_snapshot(self) -> bool:
+        try:
+            with open(self._snapshot_path, "r", encoding="utf-8") as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            config = snapshot["config"]
+            if not set(self._sections).issubset(snapshot["sections"]):
+                logger.warning("The snapshot does not include all the sections, it is ignored.")
+                return False
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning(f"{type(exc)} while loading the snapshot {self._snapshot_path}, it is ignored.")
+            return False
+
+        self._config = {section: config[section] for section in self._sections if section in config}
+        self._version = snapshot.get("version")
+        return True
+
+    def __save_snapshot(self) -> None:
+        snapshot = {"version": self._version, "sections": self._sections, "config": self._config}
+        temp_path = self._snapshot_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as snapshot_file:
+                json.dump(snapshot, snapshot_file, separators=(",", ":"))
+            # Replaced atomically, so that it is never read partially written
+            os.replace(temp_path, self._snapshot_path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.error(f"{type(exc)} while saving the snapshot {self._snapshot_path}.")
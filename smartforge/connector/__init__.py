@@ -1,4 +1,7 @@
-from .cassandra_connector import CassandraConnector
-from .opc_ua_connector import OPCUAConnector, OPCUASubscriptionHandler
-from .redis_connector import RedisConnector
-from .simulator_connector import SimulatorConnector
\ No newline at end of file
+from .cassandra_connector import CassandraConnector, CassandraRowFormat
+from .cassandra_batch_writer import CassandraBatchWriter, BatchOverflowPolicy
+from .opc_ua_connector import OPCUAConnector, OPCUASubscriptionHandler, OPCUADeadbandType, StreamOverflowPolicy
+from .opc_ua_pool import OPCUAConnectorPool
+from .redis_connector import RedisConnector, RedisBatch
+from .async_redis_connector import AsyncRedisConnector, AsyncRedisBatch
+from .simulator_connector import SimulatorConnector, AsyncSimulatorConnector
\ No newline at end of file
@@ -0,0 +1,471 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Sequence, Tuple, Union, Dict
+
+from redis.asyncio import BlockingConnectionPool, ConnectionPool, Redis
+from redis.exceptions import ResponseError
+
+from .redis_codec import RedisType, _ArrayType, _convert_values, _ValueType, _ValueTypeNotNone, \
+    decode_array, pack_array, unpack_array
+from .redis_connector import RedisBatch, _JsonValueType, _StreamEntry, _decode_stream_entries, _group_ids, _stream_fields
+from ..utils import get_logger
+
+"""
+Logger
+"""
+logger = get_logger("AsyncRedisConnector")
+
+
+class AsyncRedisConnector:
+    """
+    Asyncio connector for Redis server instances, with the same operations of :class:`RedisConnector`.
+    Commands suspend only the awaiting coroutine, hence they can overlap with other I/O on the same event loop.
+
+    ```lock_protection``` only serializes connecting and disconnecting.
+    """
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 password: str = "",
+                 lock_protection: bool = False,
+                 max_connections: Union[int, None] = None,
+                 socket_keepalive: bool = True,
+                 connection_pool: Union[ConnectionPool, None] = None) -> None:
+        """
+        At most ```max_connections``` connections are opened (no limit if ```None```), when all
+        of them are in use commands wait for one to be released.
+
+        A pool created by :meth:`AsyncRedisConnector.create_pool` can be given as ```connection_pool```
+        for sharing it with other connectors running on the same event loop.
+        """
+        logger.info(f"Creating a new AsyncRedisConnector connecting to {host}:{port}.")
+        self._host = host
+        self._port = port
+        self._password = password
+        self._max_connections = max_connections
+        self._socket_keepalive = socket_keepalive
+        self._connection_pool = connection_pool
+        self._conn: Union[Redis, None] = None
+        self._connected = False
+        # Created on first use, so that it belongs to the running event loop
+        self._lock: Union[asyncio.Lock, None] = None
+        if lock_protection:
+            self._acquire = self.__acquire_lock
+            self._release = lambda: self._lock.release()
+        else:
+            self._acquire = AsyncRedisConnector.__nothing
+            self._release = lambda: None
+
+    @staticmethod
+    async def __nothing() -> None:
+        pass
+
+    async def __acquire_lock(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        await self._lock.acquire()
+
+    async def connect(self, db: int = 0) -> None:
+        """
+        Opens a connection to the Redis instance (parameters specified when building the object).
+        The connection is open to database number ```db```.
+        """
+        await self._acquire()
+        try:
+            if self._connected:
+                logger.warning("Already connected to Redis.")
+                return
+
+            pool = self._connection_pool
+            if pool is None:
+                pool = AsyncRedisConnector.create_pool(
+                    self._host, self._port, self._password, db, self._max_connections, self._socket_keepalive)
+
+            self._conn = Redis(connection_pool=pool)
+            self._connected = True
+        finally:
+            self._release()
+
+    @staticmethod
+    def create_pool(host: str,
+                    port: int,
+                    password: str = "",
+                    db: int = 0,
+                    max_connections: Union[int, None] = None,
+                    socket_keepalive: bool = True) -> ConnectionPool:
+        """
+        Creates an asyncio connection pool to database ```db``` of the Redis instance
+        (see :meth:`RedisConnector.create_pool`).
+        """
+        if max_connections is None:
+            return ConnectionPool(host=host, port=port, db=db, password=password,
+                                  socket_keepalive=socket_keepalive)
+
+        return BlockingConnectionPool(host=host, port=port, db=db, password=password,
+                                      socket_keepalive=socket_keepalive, max_connections=max_connections)
+
+    async def disconnect(self) -> None:
+        """
+        Closes the connection to the Redis instance.
+        """
+        await self._acquire()
+        try:
+            if not self._connected:
+                logger.warning("Not connected to Redis.")
+                return
+
+            # A pool given by the user may be used by other connectors, hence it is left open
+            if self._connection_pool is None:
+                await self._conn.connection_pool.disconnect()
+            self._conn = None
+            self._connected = False
+        finally:
+            self._release()
+
+    @property
+    def is_connected(self) -> bool:
+        """
+        Returns ```true``` if the object is connected to the Redis instance,
+        ```false``` otherwise.
+        """
+        return self._connected
+
+    async def json_set(self, key: str, val: _JsonValueType, path: str = ".") -> None:
+        """
+        Sets one key-value pair in which the key is ```key``` and the value is ```val```,
+        at ```path``` (see :meth:`RedisConnector.json_set`).
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return
+
+        await self._conn.json().set(key, path, val)
+
+    async def set(self, key: str, val: _ValueTypeNotNone) -> None:
+        """
+        Sets one key-value pair in which the key is ```key``` (a string) and
+        the value is ```val``` which can be a number, a boolean, a string or bytes.
+
+        Boolean values get converted to strings.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return
+
+        if val is True or val is False:  # <=> type(val) == bool
+            val = str(val)
+        await self._conn.set(key, val)
+
+    async def multiple_set(self, pairs: Dict[str, _ValueTypeNotNone]) -> None:
+        """
+        Sets many key-value pairs in which the keys are ```pairs.keys()``` (strings) and
+        the values are ```pairs.values()``` which can be a numbers, booleans, strings or bytes.
+
+        Boolean values get converted to strings.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return
+
+        to_set = {key: str(val) if val is True or val is False else val for key, val in pairs.items()}
+        await self._conn.mset(to_set)
+
+    async def json_get(self, key: str, path: str = ".") -> _JsonValueType:
+        """
+        Retrieves the value at ```path``` of ```key``` (see :meth:`RedisConnector.json_get`).
+
+        ```None``` is returned if the connection to Redis is not established.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return None
+
+        ret = await self._conn.json().get(key, path)
+
+        return ret
+
+    async def json_multiple_get(self, keys: List[str], path: str = ".") -> List[_JsonValueType]:
+        """
+        Retrieves the values at ```path``` of ```keys``` with a single JSON.MGET (see :meth:`RedisConnector.json_get`).
+        Missing keys have value ```None```.
+
+        An empty list is returned if the connection to Redis is not established.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return list()
+
+        if len(keys) == 0:
+            return list()
+
+        ret = await self._conn.json().mget(keys, path)
+
+        return ret
+
+    async def get(self, key: str, data_type: RedisType) -> _ValueType:
+        """
+        Retrieves the value associated to ```key``` in the active Redis instance,
+        converting to type ```data_type``` before returning it.
+
+        ```None``` is returned if the connection to Redis is not established.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return None
+
+        ret = _convert_values([await self._conn.get(key)], [data_type])
+
+        return ret[0]
+
+    async def multiple_get(self, keys: List[str], data_types: List[RedisType]) -> List[_ValueType]:
+        """
+        Retrieves the values associated to ```keys``` in the active Redis instance,
+        converting to types ```data_types``` before returning them.
+
+        An empty list is returned if the connection to Redis is not established.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return list()
+
+        if len(keys) != len(data_types):
+            logger.error("Arguments keys and data_types do not have the same number of items.")
+            return list()
+
+        values = await self._conn.mget(keys) if len(keys) > 1 else [await self._conn.get(keys[0])]
+
+        ret = _convert_values(values, data_types)
+
+        return ret
+
+    async def multiple_get_array(self,
+                                 keys: List[str],
+                                 data_type: RedisType,
+                                 as_numpy: bool = True,
+                                 fill_value: Union[float, int, bool, None] = None) -> Union[_ArrayType, None]:
+        """
+        Retrieves the values associated to ```keys``` with a single MGET, as an array
+        (see :meth:`RedisConnector.multiple_get_array`).
+
+        ```None``` is returned if the connection to Redis is not established.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return None
+
+        values = await self._conn.mget(keys) if len(keys) > 0 else list()
+
+        return decode_array(values, data_type, as_numpy, fill_value)
+
+    async def set_array(self,
+                        key: str,
+                        values: Union[Sequence[Union[float, int, bool]], _ArrayType],
+                        data_type: RedisType) -> None:
+        """
+        Sets ```key``` to ```values``` packed in a single binary blob (see :meth:`RedisConnector.set_array`).
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return
+
+        await self._conn.set(key, pack_array(values, data_type))
+
+    async def get_array(self, key: str, data_type: RedisType, as_numpy: bool = True) -> Union[_ArrayType, None]:
+        """
+        Retrieves the values packed in ```key``` (see :meth:`RedisConnector.get_array`).
+
+        ```None``` is returned if the key does not exist or the connection to Redis is not established.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return None
+
+        blob = await self._conn.get(key)
+
+        return unpack_array(blob, data_type, as_numpy) if blob is not None else None
+
+    async def stream_add(self,
+                         entries: List[Tuple[str, Dict[str, _ValueTypeNotNone]]],
+                         max_length: Union[int, None] = None,
+                         approximate: bool = True) -> List[str]:
+        """
+        Appends each of ```entries``` with XADD, all in a single round trip (see :meth:`RedisConnector.stream_add`).
+
+        Returns the ids of the added entries, an empty list if it is not connected.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return list()
+
+        async with self._conn.pipeline(transaction=False) as pipeline:
+            for stream, fields in entries:
+                pipeline.xadd(stream, _stream_fields(fields), maxlen=max_length, approximate=approximate)
+            ids = await pipeline.execute()
+
+        return [entry_id.decode("utf-8") for entry_id in ids]
+
+    async def create_stream_group(self, stream: str, group: str, start_id: str = "$") -> bool:
+        """
+        Creates the consumer group ```group``` of ```stream``` (see :meth:`RedisConnector.create_stream_group`).
+
+        Returns ```true``` if the group exists (even if it already existed), ```false``` otherwise.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return False
+
+        try:
+            await self._conn.xgroup_create(stream, group, id=start_id, mkstream=True)
+        except ResponseError as exc:
+            if not str(exc).startswith("BUSYGROUP"):
+                raise
+
+        return True
+
+    async def stream_read_group(self,
+                                streams: List[str],
+                                group: str,
+                                consumer: str,
+                                count: int = 100,
+                                block: int = 1000,
+                                data_type: RedisType = RedisType.string,
+                                ack: bool = True) -> AsyncIterator[List[_StreamEntry]]:
+        """
+        Yields blocks of entries read from ```streams``` by ```consumer``` as a member of ```group```,
+        pending entries first (see :meth:`RedisConnector.stream_read_group`).
+
+        Nothing is yielded if it is not connected.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return
+
+        # Starting from the pending entries, the last id read of each stream
+        last_ids: Union[Dict[str, str], None] = {stream: "0" for stream in streams}
+        to_ack: List[_StreamEntry] = list()
+        while self._connected:
+            if len(to_ack) > 0:
+                await self.__ack(group, to_ack)
+                to_ack = list()
+
+            if last_ids is None:
+                response = await self._conn.xreadgroup(group, consumer, {stream: ">" for stream in streams},
+                                                       count=count, block=block)
+            else:
+                response = await self._conn.xreadgroup(group, consumer, last_ids, count=count)
+
+            entries, deleted = _decode_stream_entries(response, data_type)
+            if len(deleted) > 0:
+                # Trimmed before being processed, they cannot be read anymore
+                await self.__ack(group, deleted)
+
+            if last_ids is not None:
+                if len(entries) + len(deleted) == 0:
+                    last_ids = None
+                    continue
+                for stream, entry_id, _ in entries + deleted:
+                    last_ids[stream] = entry_id
+
+            if len(entries) == 0:
+                continue
+
+            yield entries
+
+            if ack:
+                to_ack = entries
+
+    async def stream_ack(self, group: str, entries: List[_StreamEntry]) -> None:
+        """
+        Acknowledges ```entries``` as processed by ```group``` (see :meth:`RedisConnector.stream_ack`).
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return
+
+        await self.__ack(group, entries)
+
+    async def __ack(self, group: str, entries: List[_StreamEntry]) -> None:
+        async with self._conn.pipeline(transaction=False) as pipeline:
+            for stream, ids in _group_ids(entries).items():
+                pipeline.xack(stream, group, *ids)
+            await pipeline.execute()
+
+    async def keys(self, pattern: str = "*", use_scan: bool = False) -> List[str]:
+        """
+        Retrieves all keys inside the Redis instance, given a ```pattern```.
+        With ```use_scan``` the keys are retrieved incrementally (see :meth:`AsyncRedisConnector.scan_keys`).
+
+        Returns an empty list both if there are no keys and if it is not connected.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return list()
+
+        if use_scan:
+            return [key async for key in self.scan_keys(pattern)]
+
+        ret = [key.decode("utf-8") for key in await self._conn.keys(pattern)]
+
+        return ret
+
+    async def scan_keys(self,
+                        pattern: str = "*",
+                        count: Union[int, None] = None,
+                        type: Union[str, None] = None) -> AsyncIterator[str]:
+        """
+        Yields the keys matching ```pattern``` using SCAN cursors (see :meth:`RedisConnector.scan_keys`).
+
+        Nothing is yielded if it is not connected.
+        """
+        if not self._connected:
+            logger.error("Not connected to Redis.")
+            return
+
+        async for key in self._conn.scan_iter(match=pattern, count=count, _type=type):
+            yield key.decode("utf-8")
+
+    @asynccontextmanager
+    async def batch(self, transaction: bool = False) -> AsyncIterator["AsyncRedisBatch"]:
+        """
+        Returns an :class:`AsyncRedisBatch` queuing commands that are sent all together, in a single round trip,
+        when the ```async with``` block exits (or when ```execute``` is awaited).
+        If ```transaction``` is set, the commands are executed atomically (MULTI/EXEC).
+
+        For example:
+        `async with conn.batch() as b:
+            b.set("a", 1)
+            b.get("a", RedisType.integer)
+        print(b.results)  # [None, 1]`
+        """
+        pipeline = self._conn.pipeline(transaction=transaction) if self._connected else None
+        batch = AsyncRedisBatch(self, pipeline)
+        yield batch
+        if batch.pending > 0:
+            await batch.execute()
+
+
+class AsyncRedisBatch(RedisBatch):
+    """
+    Commands of an :class:`AsyncRedisConnector` queued to be sent in a single round trip
+    (see :meth:`AsyncRedisConnector.batch`). Commands are queued as in :class:`RedisBatch`,
+    only ```execute``` has to be awaited.
+    """
+
+    async def execute(self) -> List[Any]:
+        """
+        Sends all the queued commands in a single round trip and returns their results.
+
+        An empty list is returned if the connector is not connected.
+        """
+        decoders = self._decoders
+        self._decoders = list()
+        self._written = list()
+        self._results = list()
+
+        if self._pipeline is None or not self._connector.is_connected:
+            logger.error("Not connected to Redis.")
+            return self._results
+
+        raw_results = await self._pipeline.execute()
+        self._results = [decode(result) for decode, result in zip(decoders, raw_results)]
+        return self._results
@@ -0,0 +1,221 @@
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum, unique
+from typing import Callable, Hashable, List, Sequence, Union
+
+from .cassandra_connector import CassandraConnector
+from ..utils import get_logger
+
+_RowType = Union[dict, tuple, list]
+
+"""
+Logger
+"""
+logger = get_logger("CassandraBatchWriter")
+
+
+@unique
+class BatchOverflowPolicy(Enum):
+    block = 0
+    drop_oldest = 1
+    drop_newest = 2
+
+
+class CassandraBatchWriter:
+    """
+    Buffered writer for time-series tables on top of a :class:`CassandraConnector`.
+    Rows are grouped by partition key and sent as single-partition UNLOGGED batches.
+    """
+
+    def __init__(self,
+                 connector: CassandraConnector,
+                 statement: str,
+                 partition_key: Sequence[Union[str, int]],
+                 max_batch_size: int = 50,
+                 flush_interval: float = 1.0,
+                 max_buffered_rows: int = 100000,
+                 overflow_policy: BatchOverflowPolicy = BatchOverflowPolicy.block,
+                 errback: Union[Callable[[List[_RowType], Union[Exception, None]], None], None] = None) -> None:
+        """
+        ```statement``` is executed for each written row, ```partition_key``` lists the
+        keys (or indexes, for tuple rows) of the row fields making up the partition key.
+
+        A partition is sent as soon as it buffers ```max_batch_size``` rows, every partition
+        is sent at least every ```flush_interval``` seconds.
+
+        At most ```max_buffered_rows``` rows are kept in memory, when full ```overflow_policy```
+        decides whether writers wait or rows get dropped.
+
+        ```errback``` is called with the rows of each batch that could not be written and the exception
+        (```None``` if the connector is not connected), such rows are counted by ```failed_rows```.
+        """
+        logger.info(f"Creating a new CassandraBatchWriter for statement: {statement}")
+        self._conn = connector
+        self._statement = statement
+        self._partition_key = list(partition_key)
+        self._max_batch_size = max(max_batch_size, 1)
+        self._flush_interval = flush_interval
+        self._max_buffered_rows = max(max_buffered_rows, 1)
+        self._overflow_policy = overflow_policy
+        self._partitions: OrderedDict[Hashable, List[_RowType]] = OrderedDict()
+        self._buffered = 0
+        self._dropped = 0
+        self._failed = 0
+        self._errback = errback
+        self._closed = False
+        self._cond = threading.Condition()
+        self._flusher = threading.Thread(target=self.__flush_periodically, name="CassandraBatchWriter", daemon=True)
+        self._flusher.start()
+
+    @property
+    def buffered_rows(self) -> int:
+        """
+        Returns the number of rows waiting to be sent.
+        """
+        with self._cond:
+            return self._buffered
+
+    @property
+    def dropped_rows(self) -> int:
+        """
+        Returns the number of rows dropped because of ```overflow_policy```.
+        """
+        with self._cond:
+            return self._dropped
+
+    @property
+    def failed_rows(self) -> int:
+        """
+        Returns the number of rows sent that could not be written.
+        """
+        with self._cond:
+            return self._failed
+
+    def write(self, row: _RowType) -> bool:
+        """
+        Buffers ```row``` for being sent with the other rows of its partition.
+
+        Returns ```false``` if the row was dropped (or the writer is closed), ```true``` otherwise.
+        """
+        key = tuple(row[k] for k in self._partition_key)
+
+        with self._cond:
+            if self._closed:
+                logger.error("The writer is closed.")
+                return False
+
+            if self._buffered >= self._max_buffered_rows:
+                if self._overflow_policy is BatchOverflowPolicy.drop_newest:
+                    self._dropped += 1
+                    return False
+                elif self._overflow_policy is BatchOverflowPolicy.drop_oldest:
+                    self.__drop_oldest()
+                else:
+                    self._cond.wait_for(lambda: self._buffered < self._max_buffered_rows or self._closed)
+                    if self._closed:
+                        return False
+
+            rows = self._partitions.get(key)
+            if rows is None:
+                rows = self._partitions[key] = list()
+            rows.append(row)
+            self._buffered += 1
+
+            if len(rows) < self._max_batch_size:
+                return True
+
+            # The partition is full, sending it right away
+            self._partitions.pop(key)
+            self._buffered -= len(rows)
+            self._cond.notify_all()
+
+        self.__send(rows)
+        return True
+
+    def flush(self) -> int:
+        """
+        Sends all the buffered rows, without waiting for Cassandra to acknowledge them
+        (use ```flush``` of the connector for that).
+
+        Returns the number of rows that could not be written so far (see ```failed_rows```).
+        """
+        with self._cond:
+            partitions = list(self._partitions.values())
+            self._partitions.clear()
+            self._buffered = 0
+            self._cond.notify_all()
+
+        for rows in partitions:
+            self.__send(rows)
+
+        return self.failed_rows
+
+    def close(self, timeout: Union[float, None] = None) -> int:
+        """
+        Sends all the buffered rows, waits up to ```timeout``` seconds (forever if ```None```)
+        for the connector to complete them and stops the writer.
+
+        Returns the number of rows that could not be written (see ```failed_rows```).
+        """
+        with self._cond:
+            if self._closed:
+                logger.warning("The writer is already closed.")
+                return self._failed
+            self._closed = True
+            self._cond.notify_all()
+
+        self._flusher.join()
+        self.flush()
+        if not self._conn.flush(timeout):
+            logger.warning("Timed out waiting for the last batches to be written.")
+
+        failed = self.failed_rows
+        if failed > 0:
+            logger.error(f"{failed} rows could not be written.")
+        return failed
+
+    def __drop_oldest(self) -> None:
+        key, rows = next(iter(self._partitions.items()))
+        rows.pop(0)
+        if len(rows) == 0:
+            self._partitions.pop(key)
+        self._buffered -= 1
+        self._dropped += 1
+
+    def __send(self, rows: List[_RowType]) -> None:
+        for start in range(0, len(rows), self._max_batch_size):
+            batch = rows[start:start + self._max_batch_size]
+            try:
+                future = self._conn.insert_batch(self._statement, batch,
+                                                  errback=lambda exc, batch=batch: self.__failed(batch, exc))
+            except Exception as exc:
+                self.__failed(rows[start:], exc)
+                raise
+            if future is None:
+                self.__failed(batch, None)
+
+    def __failed(self, rows: List[_RowType], exc: Union[Exception, None]) -> None:
+        with self._cond:
+            self._failed += len(rows)
+        if self._errback is not None:
+            try:
+                self._errback(rows, exc)
+            except Exception as errback_exc:
+                logger.error(f"{type(errback_exc)} in the errback of the writer.")
+
+    def __flush_periodically(self) -> None:
+        next_flush = time.monotonic() + self._flush_interval
+        with self._cond:
+            while not self._closed:
+                self._cond.wait(max(next_flush - time.monotonic(), 0))
+                if self._closed or time.monotonic() < next_flush:
+                    continue
+                next_flush = time.monotonic() + self._flush_interval
+                self._cond.release()
+                try:
+                    self.flush()
+                except Exception as exc:
+                    logger.error(f"{type(exc)} while flushing.")
+                finally:
+                    self._cond.acquire()
@@ -1,28 +1,82 @@
 import threading
+from collections import OrderedDict
+from enum import Enum, unique
+from queue import Queue
+from typing import Any, Callable, Iterator, Iterable, List, Union
 from cassandra.cluster import Cluster
+from cassandra.cluster import ResponseFuture
 from cassandra.cluster import Session
+from cassandra.concurrent import execute_concurrent_with_args
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.query import BatchStatement, BatchType, PreparedStatement, SimpleStatement
 from cassandra import ProtocolVersion
 from cassandra.auth import PlainTextAuthProvider
 
 from ..utils import get_logger
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for CassandraRowFormat.numpy_columns
+    np = None
+
 """
 Logger
 """
 logger = get_logger("CassandraConnector")
 
 
+@unique
+class CassandraRowFormat(Enum):
+    row = 0
+    tuple = 1
+    numpy_columns = 2
+
+
 class CassandraConnector:
-    def __init__(self, host: str, port: int, username: str = "", password: str = "", lock_protection: bool = False) -> None:
-        logger.info(f"Creating a new CassandraConnector connecting to {host}:{port}.")
-        self._host = host
+    def __init__(self,
+                 host: Union[str, List[str]],
+                 port: int,
+                 username: str = "",
+                 password: str = "",
+                 lock_protection: bool = False,
+                 prepared_cache_size: int = 128,
+                 max_in_flight: int = 256,
+                 local_dc: str = "",
+                 token_aware: bool = True,
+                 executor_threads: int = 2) -> None:
+        """
+        ```host``` is either a single contact point or a list of them (all listening on ```port```).
+
+        Requests are balanced among the nodes of the local datacenter ```local_dc``` (inferred
+        from the contact points if empty). If ```token_aware``` is set, statements with ```?```
+        markers are routed directly to a replica owning the written partition.
+        ```executor_threads``` is the number of driver threads handling asynchronous tasks.
+
+        Statements using ```?``` markers are prepared once and kept in a
+        cache holding at most ```prepared_cache_size``` statements (least recently used are evicted).
+
+        At most ```max_in_flight``` requests issued through ```insert_async``` and ```insert_batch``` are pending at
+        the same time, further calls block until one of them completes.
+        """
+        self._hosts = [host] if isinstance(host, str) else list(host)
+        logger.info(f"Creating a new CassandraConnector connecting to {', '.join(self._hosts)} on port {port}.")
         self._port = port
         self._username = username
         self._password = password
+        self._local_dc = local_dc
+        self._token_aware = token_aware
+        self._executor_threads = executor_threads
         self._cluster = None
         self._session = None
         self._keyspace = None
         self._connected = False
+        self._prepared_cache_size = max(prepared_cache_size, 1)
+        self._prepared: OrderedDict[str, PreparedStatement] = OrderedDict()
+        # Used by many producer threads even without lock_protection
+        self._prepared_lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max(max_in_flight, 1))
+        self._pending = 0
+        self._pending_done = threading.Condition()
         self._lock = threading.Lock()
         if lock_protection:
             self._acquire = lambda: self._lock.acquire()
@@ -47,11 +101,16 @@ class CassandraConnector:
                 username=self._username,
                 password=self._password
             )
+        load_balancing_policy = DCAwareRoundRobinPolicy(local_dc=self._local_dc)
+        if self._token_aware:
+            load_balancing_policy = TokenAwarePolicy(load_balancing_policy)
         self._cluster = Cluster(
-            [self._host],
+            self._hosts,
             port=self._port,
             protocol_version=ProtocolVersion.V5,
-            auth_provider=auth_provider)
+            auth_provider=auth_provider,
+            load_balancing_policy=load_balancing_policy,
+            executor_threads=self._executor_threads)
         self._session: Session = self._cluster.connect(keyspace)
         self._connected = True
         self._release()
@@ -63,7 +122,12 @@ class CassandraConnector:
             self._release()
             return
         
+        # Letting pending asynchronous inserts complete before closing the connection
+        self.flush()
         self._cluster.shutdown()
+        # Prepared statements are bound to the session that has just been closed
+        with self._prepared_lock:
+            self._prepared.clear()
         self._connected = False
         self._release()
     
@@ -89,11 +153,284 @@ class CassandraConnector:
             # Not executing queries, since it will result in an error!
             logger.warn(
                 f"Statement: {statement} expects arguments that were not given.")
+        elif CassandraConnector.__is_preparable(statement):
+            self._session.execute(self.__prepare(statement), args)
         # elif "%" not in statement and len(args) > 0:  # not interesting
         else:
             self._session.execute(statement)
         self._release()
 
+    def insert_many(self,
+                    statement: str,
+                    rows: Iterable[Union[dict, tuple, list]],
+                    concurrency: int = 100) -> List[Union[Exception, None]]:
+        """
+        Executes ```statement``` once for each item of ```rows```, keeping at most
+        ```concurrency``` requests in flight at the same time.
+
+        Statements with ```?``` markers are prepared (and cached) before being bound to each row.
+
+        Returns, in the same order of ```rows```, ```None``` for each row that was inserted
+        and the raised exception for each row that failed.
+        An empty list is returned if it is not connected.
+        """
+        self._acquire()
+        if not self._connected:
+            logger.error("Not connected to Cassandra")
+            self._release()
+            return list()
+
+        try:
+            to_execute = self.__prepare(statement) if CassandraConnector.__is_preparable(statement) else statement
+            results = execute_concurrent_with_args(
+                self._session,
+                to_execute,
+                rows,
+                concurrency=concurrency,
+                raise_on_first_error=False)
+        finally:
+            self._release()
+
+        errors = [None if success else result_or_exc for success, result_or_exc in results]
+        failed = sum(1 for error in errors if error is not None)
+        if failed > 0:
+            logger.error(f"{failed} out of {len(errors)} rows could not be inserted.")
+
+        return errors
+
+    def insert_async(self,
+                     statement: str,
+                     args: Union[dict, tuple, list] = {},
+                     callback: Union[Callable[[Any], None], None] = None,
+                     errback: Union[Callable[[Exception], None], None] = None) -> Union[ResponseFuture, None]:
+        """
+        Sends ```statement``` (with ```args```) without waiting for its completion.
+
+        ```callback``` is called with the result when the request succeeds, ```errback```
+        with the raised exception when it fails. Both run on the driver's event loop thread,
+        hence they must not block.
+
+        Blocks only when ```max_in_flight``` requests are already pending.
+        Returns the driver's future, or ```None``` if nothing has been sent.
+        """
+        self._acquire()
+        if not self._connected:
+            logger.error("Not connected to Cassandra")
+            self._release()
+            return None
+
+        if "%" in statement and len(args) == 0:
+            # Not executing queries, since it will result in an error!
+            logger.warning(
+                f"Statement: {statement} expects arguments that were not given.")
+            self._release()
+            return None
+
+        try:
+            to_execute = self.__prepare(statement) if CassandraConnector.__is_preparable(statement) else statement
+            session = self._session
+        finally:
+            # The lock is not held while waiting for Cassandra
+            self._release()
+
+        return self.__execute_async(session, to_execute, args if len(args) > 0 else None, callback, errback)
+
+    def insert_batch(self,
+                     statement: str,
+                     rows: Iterable[Union[dict, tuple, list]],
+                     callback: Union[Callable[[Any], None], None] = None,
+                     errback: Union[Callable[[Exception], None], None] = None) -> Union[ResponseFuture, None]:
+        """
+        Sends ```statement``` once for each item of ```rows``` inside a single UNLOGGED batch,
+        without waiting for its completion (see ```insert_async``` for ```callback``` and ```errback```).
+
+        UNLOGGED batches are efficient only when all ```rows``` belong to the same partition.
+        Returns the driver's future, or ```None``` if nothing has been sent.
+        """
+        self._acquire()
+        if not self._connected:
+            logger.error("Not connected to Cassandra")
+            self._release()
+            return None
+
+        try:
+            to_execute = self.__prepare(statement) if CassandraConnector.__is_preparable(statement) else statement
+            session = self._session
+        finally:
+            self._release()
+
+        batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+        for row in rows:
+            batch.add(to_execute, row)
+
+        if len(batch) == 0:
+            return None
+
+        return self.__execute_async(session, batch, None, callback, errback)
+
+    def flush(self, timeout: Union[float, None] = None) -> bool:
+        """
+        Waits until all the requests sent through ```insert_async``` and ```insert_batch``` are completed.
+
+        Returns ```false``` if ```timeout``` (in seconds) expires before that, ```true``` otherwise.
+        """
+        with self._pending_done:
+            return self._pending_done.wait_for(lambda: self._pending == 0, timeout)
+
+    def select(self,
+               statement: str,
+               args: Union[dict, tuple, list] = {},
+               fetch_size: int = 5000,
+               row_format: CassandraRowFormat = CassandraRowFormat.row) -> Iterator[Any]:
+        """
+        Executes the query ```statement``` (with ```args```) and lazily yields its result,
+        retrieving ```fetch_size``` rows at a time. The next page is requested in background
+        while the rows of the current one are consumed, hence memory stays bounded by two pages.
+
+        Depending on ```row_format```, rows are yielded as returned by the driver, as plain tuples,
+        or (```CassandraRowFormat.numpy_columns```) one dict per page mapping column names to NumPy arrays.
+
+        Nothing is yielded if it is not connected.
+        """
+        if row_format is CassandraRowFormat.numpy_columns and np is None:
+            logger.error("NumPy is required for retrieving rows as NumPy columns.")
+            return
+
+        self._acquire()
+        if not self._connected:
+            logger.error("Not connected to Cassandra")
+            self._release()
+            return
+
+        try:
+            if CassandraConnector.__is_preparable(statement):
+                query = self.__prepare(statement).bind(args)
+                query.fetch_size = fetch_size
+                parameters = None
+            else:
+                query = SimpleStatement(statement, fetch_size=fetch_size)
+                parameters = args if len(args) > 0 else None
+            future = self._session.execute_async(query, parameters)
+        finally:
+            # The lock is not held while the result is consumed
+            self._release()
+
+        # Callbacks are invoked again for each page fetched by start_fetching_next_page()
+        pages = Queue()
+        future.add_callbacks(lambda rows: pages.put((rows, None)), lambda exc: pages.put((None, exc)))
+
+        while True:
+            rows, exc = pages.get()
+            if exc is not None:
+                logger.error(f"{type(exc)} while selecting.")
+                raise exc
+
+            has_more_pages = future.has_more_pages
+            if has_more_pages:
+                future.start_fetching_next_page()
+
+            if row_format is CassandraRowFormat.numpy_columns:
+                if len(rows) > 0:
+                    yield CassandraConnector.__to_columns(rows)
+            elif row_format is CassandraRowFormat.tuple:
+                for row in rows:
+                    yield tuple(row.values()) if isinstance(row, dict) else tuple(row)
+            else:
+                yield from rows
+
+            if not has_more_pages:
+                return
+
+    @staticmethod
+    def __to_columns(rows: list) -> dict:
+        """
+        Converts a page of named tuple (or dict) ```rows``` to a dict of NumPy arrays, one per column.
+        """
+        if isinstance(rows[0], dict):
+            names = list(rows[0].keys())
+            columns = [[row[name] for row in rows] for name in names]
+        else:
+            names = getattr(rows[0], "_fields", range(len(rows[0])))
+            columns = zip(*rows)
+
+        return {name: np.asarray(column) for name, column in zip(names, columns)}
+
+    def __execute_async(self,
+                        session: Session,
+                        query,
+                        parameters,
+                        callback: Union[Callable[[Any], None], None],
+                        errback: Union[Callable[[Exception], None], None]) -> ResponseFuture:
+        """
+        Sends ```query``` through ```session```, waiting first for a free in-flight slot.
+        """
+        self._in_flight.acquire()
+        with self._pending_done:
+            self._pending += 1
+        try:
+            future = session.execute_async(query, parameters)
+        except Exception:
+            self.__release_slot()
+            raise
+
+        # The slot is released after the user callbacks have run (so that flush() waits for them), even if they raise
+        future.add_callbacks(self.__request_done, self.__request_failed,
+                             callback_kwargs={"callback": callback}, errback_kwargs={"errback": errback})
+
+        return future
+
+    def __request_done(self, result, callback: Union[Callable[[Any], None], None] = None) -> None:
+        try:
+            if callback is not None:
+                callback(result)
+        except Exception as exc:
+            logger.error(f"{type(exc)} in the callback of an asynchronous insert.")
+        finally:
+            self.__release_slot()
+
+    def __request_failed(self, exc: Exception, errback: Union[Callable[[Exception], None], None] = None) -> None:
+        logger.error(f"{type(exc)} while inserting asynchronously.")
+        try:
+            if errback is not None:
+                errback(exc)
+        except Exception as errback_exc:
+            logger.error(f"{type(errback_exc)} in the errback of an asynchronous insert.")
+        finally:
+            self.__release_slot()
+
+    def __release_slot(self) -> None:
+        with self._pending_done:
+            self._pending -= 1
+            if self._pending == 0:
+                self._pending_done.notify_all()
+        self._in_flight.release()
+
+    @staticmethod
+    def __is_preparable(statement: str) -> bool:
+        """
+        Returns ```true``` if ```statement``` uses bind markers supported by prepared statements.
+        """
+        return "%" not in statement and "?" in statement
+
+    def __prepare(self, statement: str) -> PreparedStatement:
+        """
+        Returns the prepared version of ```statement```, preparing it only if it is not cached.
+        """
+        with self._prepared_lock:
+            prepared = self._prepared.get(statement)
+            if prepared is not None:
+                self._prepared.move_to_end(statement)
+                return prepared
+
+        # Not holding the lock while waiting for Cassandra, the same statement may be prepared twice
+        prepared = self._session.prepare(statement)
+        with self._prepared_lock:
+            self._prepared[statement] = prepared
+            if len(self._prepared) > self._prepared_cache_size:
+                self._prepared.popitem(last=False)
+
+        return prepared
+
     def register_type(self, cassandra_type: str, user_type) -> None:
         self._acquire()
         if not self._connected:
@@ -1,17 +1,44 @@
 from __future__ import annotations
-import threading
-from typing import Union, Dict
+import asyncio
+from datetime import datetime
+from enum import Enum, unique
+from typing import AsyncIterator, Union, Dict, List, Tuple
 from abc import ABC, abstractmethod
 
 from asyncua import Client, Node, ua
 from asyncua.common.subscription import Subscription
+from asyncua.ua.ua_binary import struct_from_binary
 from ..utils import get_logger
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for retrieving history as NumPy arrays
+    np = None
+
 """
 Logger
 """
 logger = get_logger("OPCUAConnector")
 
+_ValueType = Union[bool, float, int]
+_SubscriptionKey = Tuple[int, "OPCUASubscriptionHandler"]
+# deadband, deadband type, sampling interval, queue size, discard oldest
+_MonitoringOptions = Tuple[Union[float, None], "OPCUADeadbandType", Union[float, None], int, bool]
+
+
+@unique
+class OPCUADeadbandType(Enum):
+    # Values as defined by the OPC-UA DeadbandType enumeration
+    absolute = 1
+    percent = 2
+
+
+@unique
+class StreamOverflowPolicy(Enum):
+    block = 0
+    drop_oldest = 1
+    keep_latest = 2
+
 
 class OPCUAConnector:
     """
@@ -24,9 +51,27 @@ class OPCUAConnector:
                  password: str = "",
                  security: str = "",
                  timeout: float = 1.0,
-                 lock_protection: bool = False) -> None:
+                 lock_protection: bool = False,
+                 max_nodes_per_request: int = 0,
+                 max_concurrent_requests: int = 0,
+                 auto_reconnect: bool = False,
+                 keep_alive_interval: float = 1.0,
+                 max_reconnect_delay: float = 30.0) -> None:
         """
         The host requires both the hostname and port to be specified.
+
+        With ```lock_protection``` connection and subscription changes are serialized by an
+        ```asyncio.Lock```, which suspends only the waiting coroutines.
+        Reads and writes are never serialized: at most ```max_concurrent_requests``` of them
+        (0 means no limit) are in flight at the same time on the secure channel.
+
+        ```get_many```, ```set_many``` and ```history``` send at most ```max_nodes_per_request``` nodes in
+        a single service call. If it is 0, the operation limits of the server are used.
+
+        With ```auto_reconnect``` the connection is checked every ```keep_alive_interval``` seconds.
+        When it is lost, reconnection is retried with exponential backoff (up to ```max_reconnect_delay```
+        seconds between attempts) and all the subscriptions are restored, transferring them to the
+        new session when the server supports it.
         """
         logger.info(f"Creating a new OPCUAConnector connecting to {host}.")
         self._host = host
@@ -36,28 +81,71 @@ class OPCUAConnector:
         self._client = Client(f"opc.tcp://{self._host}", timeout)
         self._client.set_user(self._username)
         self._client.set_password(self._password)
-        self._subscriptions: Dict[str, Subscription] = {}
+        # One subscription is shared by all the nodes with the same update interval and handler
+        self._subscriptions: Dict[_SubscriptionKey, Subscription] = {}
+        self._monitored_items: Dict[str, Tuple[_SubscriptionKey, int]] = {}
+        self._monitoring_options: Dict[str, _MonitoringOptions] = {}
+        self._auto_reconnect = auto_reconnect
+        self._keep_alive_interval = keep_alive_interval
+        self._max_reconnect_delay = max_reconnect_delay
+        self._watchdog: Union[asyncio.Task, None] = None
+        # Nodes (and their data types) resolved from node ids, browse paths or registered tags
+        self._tags: Dict[str, str] = {}
+        self._nodes: Dict[str, Node] = {}
+        self._data_types: Dict[str, ua.VariantType] = {}
+        self._max_nodes_per_request = max_nodes_per_request
+        self._max_nodes_per_read = max_nodes_per_request
+        self._max_nodes_per_write = max_nodes_per_request
+        self._max_nodes_per_history_read = max_nodes_per_request
         self._connected = False
-        self._lock = threading.Lock()
-        self._lock = threading.Lock()
+        self._max_concurrent_requests = max_concurrent_requests
+        self._lock: Union[asyncio.Lock, None] = None
+        self._requests: Union[asyncio.Semaphore, None] = None
         if lock_protection:
-            self._acquire = lambda: self._lock.acquire()
-            self._release = self._lock.release
+            self._acquire = self.__acquire_lock
+            self._release = lambda: self._lock.release()
         else:
-            self._acquire = lambda: True
+            self._acquire = OPCUAConnector.__nothing
             self._release = lambda: None
+        if max_concurrent_requests > 0:
+            self._acquire_request = self.__acquire_request_slot
+            self._release_request = lambda: self._requests.release()
+        else:
+            self._acquire_request = OPCUAConnector.__nothing
+            self._release_request = lambda: None
+
+    @staticmethod
+    async def __nothing() -> None:
+        pass
+
+    async def __acquire_lock(self) -> None:
+        # Created lazily, since before Python 3.10 asyncio primitives are bound to the loop running at creation
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        await self._lock.acquire()
+
+    async def __acquire_request_slot(self) -> None:
+        if self._requests is None:
+            self._requests = asyncio.Semaphore(self._max_concurrent_requests)
+        await self._requests.acquire()
 
     async def connect(self) -> None:
+        await self._acquire()
         try:
-            self._acquire()
             if self._connected:
                 logger.warning("Already connected to OPC-UA.")
-                self._release()
                 return
-            
+
             await self._client.set_security_string(self._security)
             await self._client.connect()
+            # Resolutions of a previous connection may be stale
+            self._nodes.clear()
+            self._data_types.clear()
+            if self._max_nodes_per_request == 0:
+                await self.__read_operation_limits()
             self._connected = True
+            if self._auto_reconnect and self._watchdog is None:
+                self._watchdog = asyncio.create_task(self.__watch_connection())
         except Exception as exc:
             logger.error(f"{type(exc)} while connecting.")
             raise
@@ -65,17 +153,34 @@ class OPCUAConnector:
             self._release()
 
     async def disconnect(self) -> None:
+        watched = self._watchdog is not None
+        if watched:
+            self._watchdog.cancel()
+            try:
+                await self._watchdog
+            except asyncio.CancelledError:
+                pass
+            self._watchdog = None
+
+        await self._acquire()
         try:
-            self._acquire()
             if not self._connected:
                 logger.warning("Not connected to OPC-UA.")
-                self._release()
+                if watched:
+                    # Lost while reconnecting: its subscriptions cannot be restored on a new connection
+                    self._subscriptions.clear()
+                    self._monitored_items.clear()
+                    self._monitoring_options.clear()
+                    await self.__drop_session()
                 return
 
             if len(self._subscriptions) > 0:
-                logger.warning(f"Removing subscriptions for tags: {self._subscriptions.keys()}")
+                logger.warning(f"Removing subscriptions for tags: {self._monitored_items.keys()}")
                 for subscription in self._subscriptions.values():
                     await subscription.delete()
+                self._subscriptions.clear()
+                self._monitored_items.clear()
+                self._monitoring_options.clear()
 
             await self._client.disconnect()
             self._connected = False
@@ -85,96 +190,838 @@ class OPCUAConnector:
         finally:
             self._release()
 
+    async def __watch_connection(self) -> None:
+        """
+        Periodically reads the state of the server, reconnecting as soon as it cannot be read.
+        """
+        server_state = [ua.NodeId(ua.ObjectIds.Server_ServerStatus_State)]
+        while True:
+            await asyncio.sleep(self._keep_alive_interval)
+            try:
+                await asyncio.wait_for(
+                    self._client.uaclient.read_attributes(server_state, ua.AttributeIds.Value),
+                    self._keep_alive_interval)
+                continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"{type(exc)} while checking the connection, reconnecting.")
+
+            delay = 0.1
+            while True:
+                await self._acquire()
+                try:
+                    self._connected = False
+                    await self.__reconnect()
+                    self._connected = True
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.error(f"{type(exc)} while reconnecting, retrying in {delay} seconds.")
+                finally:
+                    self._release()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_reconnect_delay)
+
+    async def __reconnect(self) -> None:
+        """
+        Opens a new session in place of the lost one and restores its subscriptions.
+        """
+        # The old session is not closed, so that its subscriptions can be transferred to the new one
+        await self.__drop_session()
+
+        await self._client.connect()
+        self._nodes.clear()
+        self._data_types.clear()
+        if self._max_nodes_per_request == 0:
+            await self.__read_operation_limits()
+
+        if len(self._subscriptions) == 0:
+            logger.info("Reconnected to OPC-UA.")
+            return
+
+        transferred = await self.__transfer_subscriptions()
+        failed: List[str] = list()
+        for key in [key for key in self._subscriptions.keys() if key not in transferred]:
+            failed.extend(await self.__recreate_subscription(key))
+
+        # Recreating a subscription already starts the publish loop, transferring one does not
+        uaclient = self._client.uaclient
+        if uaclient._publish_task is None or uaclient._publish_task.done():
+            uaclient._publish_task = asyncio.create_task(uaclient._publish_loop())
+
+        if len(failed) > 0:
+            logger.error(f"Could not restore subscriptions for tags: {failed}")
+        logger.info(f"Reconnected to OPC-UA, {len(transferred)} subscriptions transferred, "
+                    f"{len(self._subscriptions) - len(transferred)} recreated.")
+
+    async def __drop_session(self) -> None:
+        """
+        Stops the background tasks of the lost session and closes its socket, without closing the session.
+        """
+        renew_channel_task = getattr(self._client, "_renew_channel_task", None)
+        if renew_channel_task is not None:
+            renew_channel_task.cancel()
+        # The pending publish request of the lost session is never answered, hence its loop has to be stopped
+        uaclient = self._client.uaclient
+        publish_task = uaclient._publish_task
+        uaclient._publish_task = None
+        if publish_task is not None and not publish_task.done():
+            publish_task.cancel()
+            try:
+                await publish_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._client.disconnect_socket()
+
+    async def __transfer_subscriptions(self) -> List[_SubscriptionKey]:
+        """
+        Transfers all the subscriptions of the lost session to the current one with a single request.
+
+        Returns the keys of the subscriptions that have been transferred.
+        """
+        keys = list(self._subscriptions.keys())
+        request = ua.TransferSubscriptionsRequest()
+        request.Parameters.SubscriptionIds = [self._subscriptions[key].subscription_id for key in keys]
+        request.Parameters.SendInitialValues = True
+        try:
+            data = await self._client.uaclient.protocol.send_request(request)
+            response = struct_from_binary(ua.TransferSubscriptionsResponse, data)
+            response.ResponseHeader.ServiceResult.check()
+        except Exception as exc:
+            logger.warning(f"{type(exc)} while transferring subscriptions, recreating them.")
+            return list()
+
+        transferred = [key for key, result in zip(keys, response.Parameters.Results) if result.StatusCode.is_good()]
+
+        return transferred
+
+    async def __recreate_subscription(self, key: _SubscriptionKey) -> List[str]:
+        """
+        Creates again the subscription identified by ```key``` and all its monitored items.
+
+        Returns the node ids that could not be monitored again.
+        """
+        update_interval, subscription_handler = key
+        node_ids = [node_id for node_id, (item_key, _) in self._monitored_items.items() if item_key == key]
+        subscription = await self._client.create_subscription(update_interval, subscription_handler)
+        self._subscriptions[key] = subscription
+
+        nodes = await self.__nodes(node_ids)
+        requests = [
+            OPCUAConnector.__monitored_item_request(subscription, node, *self._monitoring_options[node_id])
+            for node_id, node in zip(node_ids, nodes) if node is not None]
+        handles = await subscription.create_monitored_items(requests) if len(requests) > 0 else list()
+
+        failed: List[str] = list()
+        monitored = iter(handles)
+        for node_id, node in zip(node_ids, nodes):
+            handle = next(monitored) if node is not None else None
+            if handle is None or isinstance(handle, ua.StatusCode):
+                failed.append(node_id)
+                self._monitored_items.pop(node_id)
+                self._monitoring_options.pop(node_id)
+            else:
+                self._monitored_items[node_id] = (key, handle)
+
+        if len(failed) > 0:
+            await self.__delete_if_unused(key)
+
+        return failed
+
+    @property
+    def host(self) -> str:
+        return self._host
+
     @property
     def is_connected(self) -> bool:
-        self._acquire()
-        conn = self._connected
-        self._release()
+        return self._connected
 
-        return conn
+    async def __read_operation_limits(self) -> None:
+        """
+        Reads the maximum number of nodes the server accepts in a single Read, Write and HistoryRead request.
+        """
+        try:
+            limits = await self._client.uaclient.read_attributes(
+                [ua.NodeId(ua.ObjectIds.Server_ServerCapabilities_OperationLimits_MaxNodesPerRead),
+                 ua.NodeId(ua.ObjectIds.Server_ServerCapabilities_OperationLimits_MaxNodesPerWrite),
+                 ua.NodeId(ua.ObjectIds.Server_ServerCapabilities_OperationLimits_MaxNodesPerHistoryReadData)],
+                ua.AttributeIds.Value)
+        except Exception as exc:
+            logger.warning(f"{type(exc)} while reading the operation limits, not splitting requests.")
+            return
 
-    async def set(self,
-                  node_id: str,
-                  value: Union[bool, float, int],
-                  precision: Union[int, None] = None) -> None:
-        variant_type: Union[ua.VariantType, None] = None
+        # A missing or zero limit means that the server does not enforce one
+        read_limit, write_limit, history_read_limit = [
+            limit.Value.Value if limit.StatusCode.is_good() else None for limit in limits]
+        self._max_nodes_per_read = read_limit or 0
+        self._max_nodes_per_write = write_limit or 0
+        self._max_nodes_per_history_read = history_read_limit or 0
 
+    @staticmethod
+    def __variant_type(value: _ValueType, precision: Union[int, None]) -> Union[ua.VariantType, None]:
+        """
+        Returns the variant type to use for writing ```value``` with ```precision``` bits,
+        ```None``` if the type of ```value``` is not supported.
+        """
         if type(value) == bool:
-            variant_type = ua.VariantType.Boolean
+            return ua.VariantType.Boolean
         elif type(value) == float:
             if precision == 32:
-                variant_type = ua.VariantType.Float
+                return ua.VariantType.Float
             elif precision == 64 or precision is None:
-                variant_type = ua.VariantType.Double
+                return ua.VariantType.Double
         elif type(value) == int:
             if precision == 16:
-                variant_type = ua.VariantType.Int16
+                return ua.VariantType.Int16
             elif precision == 32:
-                variant_type = ua.VariantType.Int32
+                return ua.VariantType.Int32
             elif precision == 64 or precision is None:
-                variant_type = ua.VariantType.Int64
+                return ua.VariantType.Int64
+
+        return None
+
+    @staticmethod
+    def __chunks(items: list, size: int) -> List[list]:
+        """
+        Splits ```items``` in lists of at most ```size``` items (a single list if ```size``` is 0).
+        """
+        if len(items) == 0:
+            return list()
+
+        if size <= 0:
+            return [items]
+
+        return [items[start:start + size] for start in range(0, len(items), size)]
+
+    def register_tags(self, tags: Dict[str, str]) -> None:
+        """
+        Registers symbolic names for nodes (e.g., the OPC-UA tags of the configuration), so that
+        they can be used in place of node ids. ```tags``` maps each name to a node id
+        (e.g., ```ns=2;i=1```) or to a browse path from the Objects folder (e.g., ```2:PLC/2:Temperature```).
+        """
+        for tag in tags.keys():
+            self._nodes.pop(tag, None)
+            self._data_types.pop(tag, None)
+        self._tags.update(tags)
+
+    async def resolve(self, node_ids: List[str]) -> List[Union[ua.NodeId, None]]:
+        """
+        Resolves, with as few requests as possible, ```node_ids``` (node ids, browse paths
+        or registered tags) and caches them together with their data type, until the next connection.
+
+        Returns, in the same order, the resolved node ids (```None``` for those that could not be resolved).
+        """
+        if not self._connected:
+            logger.error("Not connected to OPC-UA.")
+            return [None] * len(node_ids)
+
+        await self._acquire_request()
+        try:
+            nodes = await self.__nodes(node_ids)
+        finally:
+            self._release_request()
+
+        return [node.nodeid if node is not None else None for node in nodes]
+
+    async def __nodes(self, node_ids: List[str]) -> List[Union[Node, None]]:
+        """
+        Returns the nodes of ```node_ids```, resolving in bulk those that are not cached.
+        """
+        to_resolve = [node_id for node_id in dict.fromkeys(node_ids) if node_id not in self._nodes]
+        if len(to_resolve) > 0:
+            await self.__resolve(to_resolve)
+
+        return [self._nodes.get(node_id) for node_id in node_ids]
+
+    async def __resolve(self, node_ids: List[str]) -> None:
+        """
+        Translates the browse paths among ```node_ids``` with TranslateBrowsePathsToNodeIds,
+        then reads the data types of all of them. Both are cached.
+        """
+        resolved: Dict[str, ua.NodeId] = {}
+        browse_paths: Dict[str, ua.BrowsePath] = {}
+        for node_id in node_ids:
+            target = self._tags.get(node_id, node_id)
+            try:
+                resolved[node_id] = ua.NodeId.from_string(target)
+            except ua.UaStringParsingError:
+                browse_paths[node_id] = OPCUAConnector.__browse_path(target)
+
+        translated: List[ua.BrowsePathResult] = list()
+        for chunk in OPCUAConnector.__chunks(list(browse_paths.values()), self._max_nodes_per_read):
+            translated.extend(await self._client.uaclient.translate_browsepaths_to_nodeids(chunk))
+        unresolved: List[str] = list()
+        for node_id, result in zip(browse_paths.keys(), translated):
+            if result.StatusCode.is_good() and len(result.Targets) > 0:
+                target = result.Targets[0].TargetId
+                resolved[node_id] = ua.NodeId(target.Identifier, target.NamespaceIndex, target.NodeIdType)
+            else:
+                unresolved.append(node_id)
+
+        if len(unresolved) > 0:
+            logger.error(f"Could not resolve tags: {unresolved}")
+
+        data_types: List[ua.DataValue] = list()
+        for chunk in OPCUAConnector.__chunks(list(resolved.values()), self._max_nodes_per_read):
+            data_types.extend(await self._client.uaclient.read_attributes(chunk, ua.AttributeIds.DataType))
+        for (node_id, resolved_node_id), data_type in zip(resolved.items(), data_types):
+            self._nodes[node_id] = self._client.get_node(resolved_node_id)
+            if data_type.StatusCode.is_good():
+                variant_type = OPCUAConnector.__builtin_variant_type(data_type.Value.Value)
+                if variant_type is not None:
+                    self._data_types[node_id] = variant_type
+
+    @staticmethod
+    def __browse_path(path: str) -> ua.BrowsePath:
+        """
+        Builds the browse path from the Objects folder for ```path```, made of qualified names separated by ```/```.
+        """
+        browse_path = ua.BrowsePath()
+        browse_path.StartingNode = ua.NodeId(ua.ObjectIds.ObjectsFolder)
+        for name in path.strip("/").split("/"):
+            element = ua.RelativePathElement()
+            element.ReferenceTypeId = ua.NodeId(ua.ObjectIds.HierarchicalReferences)
+            element.IsInverse = False
+            element.IncludeSubtypes = True
+            element.TargetName = ua.QualifiedName.from_string(name)
+            browse_path.RelativePath.Elements.append(element)
+
+        return browse_path
+
+    @staticmethod
+    def __builtin_variant_type(data_type: ua.NodeId) -> Union[ua.VariantType, None]:
+        """
+        Returns the variant type matching ```data_type``` if it is a built-in numeric or boolean type.
+        """
+        if data_type.NamespaceIndex != 0 or not isinstance(data_type.Identifier, int):
+            return None
+
+        if ua.VariantType.Boolean.value <= data_type.Identifier <= ua.VariantType.Double.value:
+            return ua.VariantType(data_type.Identifier)
+
+        return None
+
+    def __node_variant_type(self, node_id: str, value: _ValueType, variant_type: ua.VariantType) -> ua.VariantType:
+        """
+        Returns the data type of ```node_id``` if known, otherwise ```variant_type``` (inferred from ```value```).
+        Raises ```TypeError``` if ```value``` cannot be written as the data type of the node.
+        """
+        node_type = self._data_types.get(node_id)
+        if node_type is None:
+            return variant_type
+
+        # Cached data types are the built-in ones from Boolean to Double, integers can be written to floats only
+        if type(value) == bool:
+            compatible = node_type == ua.VariantType.Boolean
+        elif type(value) == int:
+            compatible = node_type != ua.VariantType.Boolean
+        else:
+            compatible = node_type in (ua.VariantType.Float, ua.VariantType.Double)
+        if not compatible:
+            raise TypeError(f"Cannot write {type(value).__name__} value {value!r} to {node_id}, "
+                            f"whose data type is {node_type.name}.")
+
+        return node_type
+
+    async def set(self,
+                  node_id: str,
+                  value: Union[bool, float, int],
+                  precision: Union[int, None] = None) -> None:
+        """
+        Writes ```value``` to ```node_id```. If ```precision``` (in bits) is not given,
+        the data type of the node is used when known, otherwise it is inferred from ```value```.
+
+        Raises ```TypeError``` if ```value``` does not match the known data type of the node
+        (e.g., a bool for a Double node or a float for an Int32 node).
+        """
+        variant_type = OPCUAConnector.__variant_type(value, precision)
 
         if variant_type is None:
             logger.error("value has a wrong type, "
                          "it can only have types: bool, float, int")
             return
 
-        self._acquire()
         if not self._connected:
             logger.error("Not connected to OPC-UA.")
-            self._release()
             return
 
-        node = self._client.get_node(node_id)
-        to_write = ua.Variant(value, variant_type)
-        await node.write_attribute(ua.AttributeIds.Value, ua.DataValue(to_write))
-        self._release()
+        await self._acquire_request()
+        try:
+            node = (await self.__nodes([node_id]))[0]
+            if node is None:
+                return
+            if precision is None:
+                variant_type = self.__node_variant_type(node_id, value, variant_type)
+            to_write = ua.Variant(value, variant_type)
+            await node.write_attribute(ua.AttributeIds.Value, ua.DataValue(to_write))
+        finally:
+            self._release_request()
 
     async def get(self, node_id: str) -> Union[bool, float, int]:
-        self._acquire()
         if not self._connected:
             logger.error("Not connected to OPC-UA.")
-            self._release()
             return None
 
-        node = self._client.get_node(node_id)
-        attr = await node.read_attribute(ua.AttributeIds.Value)
-        self._release()
+        await self._acquire_request()
+        try:
+            node = (await self.__nodes([node_id]))[0]
+            if node is None:
+                return None
+            attr = await node.read_attribute(ua.AttributeIds.Value)
+        finally:
+            self._release_request()
 
         return attr.Value.Value
 
+    async def get_many(self, node_ids: List[str]) -> List[Tuple[Union[_ValueType, None], ua.StatusCode]]:
+        """
+        Reads the values of all ```node_ids``` with as few Read requests as the server allows.
+
+        Returns, in the same order of ```node_ids```, the value (```None``` if it could not be read)
+        and the status code of each node. An empty list is returned if it is not connected.
+        """
+        if not self._connected:
+            logger.error("Not connected to OPC-UA.")
+            return list()
+
+        await self._acquire_request()
+        try:
+            nodes = await self.__nodes(node_ids)
+            results: List[ua.DataValue] = list()
+            node_ids_to_read = [node.nodeid for node in nodes if node is not None]
+            for chunk in OPCUAConnector.__chunks(node_ids_to_read, self._max_nodes_per_read):
+                results.extend(await self._client.uaclient.read_attributes(chunk, ua.AttributeIds.Value))
+        finally:
+            self._release_request()
+
+        read = iter(results)
+        unknown = ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown)
+        ret: List[Tuple[Union[_ValueType, None], ua.StatusCode]] = list()
+        for node in nodes:
+            result = next(read) if node is not None else None
+            if result is None:
+                ret.append((None, unknown))
+            else:
+                ret.append((result.Value.Value if result.StatusCode.is_good() else None, result.StatusCode))
+
+        return ret
+
+    async def set_many(self,
+                       values: Dict[str, Tuple[_ValueType, Union[int, None]]]) -> List[ua.StatusCode]:
+        """
+        Writes, for each ```node_id``` in ```values```, the pair ```(value, precision)``` (see ```set```)
+        with as few Write requests as the server allows.
+
+        Returns the status code of each write, in the same order of ```values```.
+        An empty list is returned if it is not connected or if any value has a wrong type.
+        Raises ```TypeError``` (writing nothing) if any value does not match the known data type of its node.
+        """
+        variant_types: List[ua.VariantType] = list()
+        for node_id, (value, precision) in values.items():
+            variant_type = OPCUAConnector.__variant_type(value, precision)
+            if variant_type is None:
+                logger.error(f"value of {node_id} has a wrong type, "
+                             "it can only have types: bool, float, int")
+                return list()
+            variant_types.append(variant_type)
+
+        if not self._connected:
+            logger.error("Not connected to OPC-UA.")
+            return list()
+
+        await self._acquire_request()
+        try:
+            nodes = await self.__nodes(list(values.keys()))
+            pairs: List[Tuple[ua.NodeId, ua.DataValue]] = list()
+            for (node_id, (value, precision)), variant_type, node in zip(values.items(), variant_types, nodes):
+                if node is None:
+                    continue
+                if precision is None:
+                    variant_type = self.__node_variant_type(node_id, value, variant_type)
+                pairs.append((node.nodeid, ua.DataValue(ua.Variant(value, variant_type))))
+
+            results: List[ua.StatusCode] = list()
+            for chunk in OPCUAConnector.__chunks(pairs, self._max_nodes_per_write):
+                chunk_node_ids, chunk_values = zip(*chunk)
+                results.extend(await self._client.uaclient.write_attributes(
+                    list(chunk_node_ids), list(chunk_values), ua.AttributeIds.Value))
+        finally:
+            self._release_request()
+
+        written = iter(results)
+        unknown = ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown)
+        return [next(written) if node is not None else unknown for node in nodes]
+
     async def start_subscription(self,
                                  node_id: str,
                                  subscription_handler: OPCUASubscriptionHandler,
-                                 update_interval: int = 500) -> None:
-        self._acquire()
+                                 update_interval: int = 500,
+                                 deadband: Union[float, None] = None,
+                                 deadband_type: OPCUADeadbandType = OPCUADeadbandType.absolute,
+                                 sampling_interval: Union[float, None] = None,
+                                 queue_size: int = 0,
+                                 discard_oldest: bool = True) -> None:
+        await self.start_subscriptions([node_id], subscription_handler, update_interval,
+                                       deadband, deadband_type, sampling_interval, queue_size, discard_oldest)
+
+    async def start_subscriptions(self,
+                                  node_ids: List[str],
+                                  subscription_handler: OPCUASubscriptionHandler,
+                                  update_interval: int = 500,
+                                  deadband: Union[float, Dict[str, float], None] = None,
+                                  deadband_type: OPCUADeadbandType = OPCUADeadbandType.absolute,
+                                  sampling_interval: Union[float, None] = None,
+                                  queue_size: int = 0,
+                                  discard_oldest: bool = True) -> List[str]:
+        """
+        Monitors the value of all ```node_ids```, notifying ```subscription_handler``` of their changes.
+
+        Nodes with the same ```update_interval``` and ```subscription_handler``` share a single
+        subscription on the server, their monitored items are created with one request.
+
+        Changes smaller than ```deadband``` (either one value for all nodes or one per node id,
+        nodes without it are not filtered) are discarded by the server. With
+        ```OPCUADeadbandType.percent``` the deadband is a percentage of the EURange of the node.
+        Nodes are sampled every ```sampling_interval``` milliseconds (```update_interval``` if ```None```),
+        the server queues up to ```queue_size``` samples between two notifications, discarding the oldest
+        (or, if not ```discard_oldest```, the newest) ones when the queue is full.
+
+        A node can be monitored by a single subscription: nodes already monitored with the same
+        ```update_interval``` and ```subscription_handler``` are left as they are, those monitored
+        with different ones cannot be monitored (until their monitoring is stopped).
+
+        Returns the node ids that could not be monitored.
+        """
+        failed, _ = await self.__start_subscriptions(node_ids, subscription_handler, update_interval, deadband,
+                                                     deadband_type, sampling_interval, queue_size, discard_oldest)
+        return failed
+
+    async def __start_subscriptions(self,
+                                    node_ids: List[str],
+                                    subscription_handler: OPCUASubscriptionHandler,
+                                    update_interval: int,
+                                    deadband: Union[float, Dict[str, float], None],
+                                    deadband_type: OPCUADeadbandType,
+                                    sampling_interval: Union[float, None],
+                                    queue_size: int,
+                                    discard_oldest: bool) -> Tuple[List[str], List[str]]:
+        """
+        Returns the node ids that could not be monitored and those whose monitored items have been created.
+        """
+        await self._acquire()
         if not self._connected:
             logger.error("Not connected to OPC-UA.")
             self._release()
-            return None
+            return list(node_ids), list()
+
+        try:
+            key = (update_interval, subscription_handler)
+            already_monitored = [node_id for node_id in node_ids if node_id in self._monitored_items]
+            if len(already_monitored) > 0:
+                logger.warning(f"Tags already subscribed: {already_monitored}")
+            failed: List[str] = list(dict.fromkeys(
+                node_id for node_id in already_monitored if self._monitored_items[node_id][0] != key))
+            to_monitor = list(dict.fromkeys(node_id for node_id in node_ids if node_id not in self._monitored_items))
+            nodes = await self.__nodes(to_monitor)
+            failed.extend(node_id for node_id, node in zip(to_monitor, nodes) if node is None)
+            to_monitor = [node_id for node_id, node in zip(to_monitor, nodes) if node is not None]
+            nodes = [node for node in nodes if node is not None]
+            if len(to_monitor) == 0:
+                if len(failed) > 0:
+                    logger.error(f"Could not subscribe to tags: {failed}")
+                return failed, list()
+
+            subscription = self._subscriptions.get(key)
+            if subscription is None:
+                subscription = await self._client.create_subscription(update_interval, subscription_handler)
+                self._subscriptions[key] = subscription
+
+            handles = await subscription.create_monitored_items([
+                OPCUAConnector.__monitored_item_request(
+                    subscription,
+                    node,
+                    deadband.get(node_id) if isinstance(deadband, dict) else deadband,
+                    deadband_type,
+                    sampling_interval,
+                    queue_size,
+                    discard_oldest)
+                for node_id, node in zip(to_monitor, nodes)])
+
+            created: List[str] = list()
+            for node_id, handle in zip(to_monitor, handles):
+                if isinstance(handle, ua.StatusCode):
+                    failed.append(node_id)
+                else:
+                    created.append(node_id)
+                    self._monitored_items[node_id] = (key, handle)
+                    self._monitoring_options[node_id] = (
+                        deadband.get(node_id) if isinstance(deadband, dict) else deadband,
+                        deadband_type,
+                        sampling_interval,
+                        queue_size,
+                        discard_oldest)
 
-        subscription: Subscription = await self._client.create_subscription(update_interval, subscription_handler)
-        self._subscriptions[node_id] = subscription
-        node = self._client.get_node(node_id)
-        await subscription.subscribe_data_change(node)
-        self._release()
+            if len(failed) > 0:
+                logger.error(f"Could not subscribe to tags: {failed}")
+                await self.__delete_if_unused(key)
+
+            return failed, created
+        finally:
+            self._release()
 
     async def stop_subscription(self, node_id: str):
-        self._acquire()
+        await self.stop_subscriptions([node_id])
+
+    async def stop_subscriptions(self, node_ids: List[str]) -> None:
+        """
+        Stops monitoring ```node_ids```, removing their monitored items with one request per subscription.
+        Subscriptions left without monitored items are deleted.
+        """
+        await self._acquire()
         if not self._connected:
             logger.error("Not connected to OPC-UA.")
             self._release()
             return None
 
-        subscription = self._subscriptions.get(node_id)
-        if subscription is not None:
-            await subscription.delete()
-            self._subscriptions.pop(node_id)
+        try:
+            handles: Dict[_SubscriptionKey, List[int]] = {}
+            for node_id in node_ids:
+                item = self._monitored_items.pop(node_id, None)
+                self._monitoring_options.pop(node_id, None)
+                if item is not None:
+                    key, handle = item
+                    handles.setdefault(key, list()).append(handle)
+
+            for key, key_handles in handles.items():
+                await self._subscriptions[key].unsubscribe(key_handles)
+                await self.__delete_if_unused(key)
+        finally:
+            self._release()
+
+    async def stream(self,
+                     node_ids: List[str],
+                     update_interval: int = 500,
+                     max_buffered: int = 1000,
+                     overflow_policy: StreamOverflowPolicy = StreamOverflowPolicy.keep_latest
+                     ) -> AsyncIterator[Tuple[str, _ValueType, datetime]]:
+        """
+        Subscribes to ```node_ids``` and yields a tuple ```(node_id, value, timestamp)``` for each data change,
+        until the iteration is stopped (then the subscription is stopped too).
+
+        Data changes are buffered in a queue of at most ```max_buffered``` items, when it is full
+        ```overflow_policy``` decides whether the OPC-UA client waits for the consumer, the oldest change
+        is dropped, or only the latest value of each node is kept.
+
+        Raises ```ValueError``` if any of ```node_ids``` is already monitored (e.g., by another stream).
+        """
+        resolved = await self.resolve(node_ids)
+        handler = _OPCUAStreamHandler(
+            {nodeid: node_id for node_id, nodeid in zip(node_ids, resolved) if nodeid is not None},
+            max_buffered,
+            overflow_policy)
+        failed, created = await self.__start_subscriptions(
+            node_ids, handler, update_interval, None, OPCUADeadbandType.absolute, None, 0, True)
+        # Not created by this stream, hence they would never be notified to it
+        already_monitored = [node_id for node_id in failed if node_id in self._monitored_items]
+        if len(already_monitored) > 0:
+            if len(created) > 0:
+                await self.stop_subscriptions(created)
+            raise ValueError(f"Tags already subscribed, they cannot be streamed: {already_monitored}")
+        if len(created) == 0:
+            return
+
+        try:
+            while True:
+                yield await handler.next()
+        finally:
+            if handler.dropped > 0:
+                logger.warning(f"{handler.dropped} data changes were dropped while streaming.")
+            if self.is_connected:
+                await self.stop_subscriptions(created)
+
+    @staticmethod
+    def __monitored_item_request(subscription: Subscription,
+                                 node: Node,
+                                 deadband: Union[float, None],
+                                 deadband_type: OPCUADeadbandType,
+                                 sampling_interval: Union[float, None],
+                                 queue_size: int,
+                                 discard_oldest: bool) -> ua.MonitoredItemCreateRequest:
+        """
+        Builds the request for monitoring the value of ```node``` inside ```subscription```.
+        """
+        data_change_filter = None
+        if deadband is not None:
+            data_change_filter = ua.DataChangeFilter()
+            data_change_filter.Trigger = ua.DataChangeTrigger.StatusValue
+            data_change_filter.DeadbandType = deadband_type.value
+            data_change_filter.DeadbandValue = deadband
+
+        # Using the subscription for building the request, since it assigns the client handle
+        request = subscription._make_monitored_item_request(
+            node, ua.AttributeIds.Value, data_change_filter, queue_size, ua.MonitoringMode.Reporting)
+        if sampling_interval is not None:
+            request.RequestedParameters.SamplingInterval = sampling_interval
+        request.RequestedParameters.DiscardOldest = discard_oldest
+
+        return request
+
+    async def history(self,
+                      node_ids: List[str],
+                      start: datetime,
+                      end: datetime,
+                      values_per_page: int = 1000,
+                      as_numpy: bool = False) -> AsyncIterator[Tuple[str, list, list]]:
+        """
+        Reads the raw history of ```node_ids``` between ```start``` and ```end```, page by page.
+
+        Yields a tuple ```(node_id, timestamps, values)``` for each page of at most ```values_per_page```
+        values of a node, following the continuation points of the server. With ```as_numpy```
+        timestamps and values are NumPy arrays instead of lists.
+        Only a page per node is kept in memory, whatever the length of the time range.
+        """
+        if as_numpy and np is None:
+            logger.error("NumPy is required for retrieving history as NumPy arrays.")
+            return
+
+        if not self._connected:
+            logger.error("Not connected to OPC-UA.")
+            return
+
+        await self._acquire_request()
+        try:
+            nodes = await self.__nodes(node_ids)
+        finally:
+            self._release_request()
+
+        details = ua.ReadRawModifiedDetails()
+        details.IsReadModified = False
+        details.StartTime = start
+        details.EndTime = end
+        details.NumValuesPerNode = values_per_page
+        details.ReturnBounds = False
+
+        # Nodes still to be read, with the continuation point of their next page
+        pending: Dict[str, Tuple[ua.NodeId, Union[bytes, None]]] = {
+            node_id: (node.nodeid, None) for node_id, node in zip(node_ids, nodes) if node is not None}
+        try:
+            while len(pending) > 0:
+                to_read = list(pending.items())
+                if self._max_nodes_per_history_read > 0:
+                    to_read = to_read[:self._max_nodes_per_history_read]
+                results = await self.__history_read(details, [item for _, item in to_read], False)
 
-        self._release()
+                for (node_id, (nodeid, _)), result in zip(to_read, results):
+                    if result.StatusCode.is_good() and result.ContinuationPoint:
+                        pending[node_id] = (nodeid, result.ContinuationPoint)
+                    else:
+                        pending.pop(node_id)
+
+                    if not result.StatusCode.is_good():
+                        logger.error(f"Could not read the history of {node_id}: {result.StatusCode.name}")
+                        continue
+
+                    data_values: List[ua.DataValue] = result.HistoryData.DataValues if result.HistoryData else list()
+                    if len(data_values) > 0:
+                        yield (node_id, *OPCUAConnector.__to_columns(data_values, as_numpy))
+        finally:
+            # Letting the server free the pages that will not be read
+            to_release = [item for item in pending.values() if item[1] is not None]
+            if len(to_release) > 0 and self._connected:
+                await self.__history_read(details, to_release, True)
+
+    async def __history_read(self,
+                             details: ua.ReadRawModifiedDetails,
+                             nodes: List[Tuple[ua.NodeId, Union[bytes, None]]],
+                             release_continuation_points: bool) -> List[ua.HistoryReadResult]:
+        """
+        Sends a single HistoryRead request for all ```nodes``` (pairs of node id and continuation point).
+        """
+        params = ua.HistoryReadParameters()
+        params.HistoryReadDetails = details
+        params.TimestampsToReturn = ua.TimestampsToReturn.Both
+        params.ReleaseContinuationPoints = release_continuation_points
+        for nodeid, continuation_point in nodes:
+            value_id = ua.HistoryReadValueId()
+            value_id.NodeId = nodeid
+            value_id.ContinuationPoint = continuation_point
+            params.NodesToRead.append(value_id)
+
+        await self._acquire_request()
+        try:
+            return await self._client.uaclient.history_read(params)
+        finally:
+            self._release_request()
+
+    @staticmethod
+    def __to_columns(data_values: List[ua.DataValue], as_numpy: bool) -> Tuple[list, list]:
+        """
+        Splits ```data_values``` in the list (or NumPy array) of their timestamps and the one of their values.
+        """
+        timestamps = [data_value.SourceTimestamp or data_value.ServerTimestamp for data_value in data_values]
+        values = [data_value.Value.Value if data_value.Value is not None else None for data_value in data_values]
+        if as_numpy:
+            return np.array(timestamps, dtype="datetime64[us]"), np.asarray(values)
+
+        return timestamps, values
+
+    async def __delete_if_unused(self, key: _SubscriptionKey) -> None:
+        """
+        Deletes the subscription identified by ```key``` if none of its monitored items is left.
+        """
+        if all(item_key != key for item_key, _ in self._monitored_items.values()):
+            await self._subscriptions.pop(key).delete()
 
 
 class OPCUASubscriptionHandler(ABC):
     @abstractmethod
     def datachange_notification(self, node: Node, val, data) -> None:
         pass
+
+
+class _OPCUAStreamHandler(OPCUASubscriptionHandler):
+    """
+    Buffers the data changes of a subscription for :meth:`OPCUAConnector.stream`.
+    """
+
+    def __init__(self,
+                 node_ids: Dict[ua.NodeId, str],
+                 max_buffered: int,
+                 overflow_policy: StreamOverflowPolicy) -> None:
+        self._node_ids = node_ids
+        self._overflow_policy = overflow_policy
+        self.dropped = 0
+        if overflow_policy is StreamOverflowPolicy.keep_latest:
+            # The queue contains each node at most once, its value is the latest one inside _latest
+            self._queue = asyncio.Queue()
+            self._latest: Dict[str, Tuple[_ValueType, datetime]] = {}
+        else:
+            self._queue = asyncio.Queue(max(max_buffered, 1))
+
+    async def datachange_notification(self, node: Node, val, data) -> None:
+        node_id = self._node_ids.get(node.nodeid, node.nodeid.to_string())
+        timestamp = data.monitored_item.Value.SourceTimestamp or data.monitored_item.Value.ServerTimestamp
+
+        if self._overflow_policy is StreamOverflowPolicy.keep_latest:
+            if node_id in self._latest:
+                self.dropped += 1
+            else:
+                self._queue.put_nowait(node_id)
+            self._latest[node_id] = (val, timestamp)
+        elif self._overflow_policy is StreamOverflowPolicy.drop_oldest:
+            if self._queue.full():
+                self._queue.get_nowait()
+                self.dropped += 1
+            self._queue.put_nowait((node_id, val, timestamp))
+        else:
+            await self._queue.put((node_id, val, timestamp))
+
+    async def next(self) -> Tuple[str, _ValueType, datetime]:
+        item = await self._queue.get()
+        if self._overflow_policy is StreamOverflowPolicy.keep_latest:
+            val, timestamp = self._latest.pop(item)
+            return item, val, timestamp
+
+        return item
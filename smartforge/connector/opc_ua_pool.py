@@ -0,0 +1,197 @@
+import asyncio
+from typing import Dict, List, Tuple, Union
+
+from asyncua import ua
+
+from .opc_ua_connector import OPCUAConnector, OPCUASubscriptionHandler
+from ..utils import get_logger
+
+_ValueType = Union[bool, float, int]
+
+"""
+Logger
+"""
+logger = get_logger("OPCUAConnectorPool")
+
+
+class OPCUAConnectorPool:
+    """
+    Pool of connectors to many OPC-UA servers, sharing the same event loop.
+    Requests are routed to the connector registered with the longest prefix of the node id
+    (which is given to the connector without the prefix), those addressing different servers are sent concurrently.
+    """
+
+    def __init__(self, max_sessions: int = 0) -> None:
+        """
+        At most ```max_sessions``` connectors (i.e., sessions) can be added to the pool (0 means no limit).
+        """
+        logger.info("Creating a new OPCUAConnectorPool.")
+        self._max_sessions = max_sessions
+        self._connectors: Dict[str, OPCUAConnector] = {}
+
+    def add(self, prefix: str, connector: OPCUAConnector) -> bool:
+        """
+        Adds ```connector``` to the pool, routing to it the node ids (or tags) starting with ```prefix```
+        (e.g., "plc1/" for "plc1/ns=2;i=1"), the same connector can be added with many prefixes.
+
+        Returns ```false``` if the pool would hold more than ```max_sessions``` distinct connectors.
+        """
+        connectors = {conn for other, conn in self._connectors.items() if other != prefix}
+        connectors.add(connector)
+        if 0 < self._max_sessions < len(connectors):
+            logger.error(f"The pool cannot hold more than {self._max_sessions} sessions.")
+            return False
+
+        self._connectors[prefix] = connector
+        return True
+
+    def connector(self, node_id: str) -> Union[OPCUAConnector, None]:
+        """
+        Returns the connector ```node_id``` is routed to, ```None``` if there is none.
+        """
+        prefix = self.__prefix(node_id)
+        return self._connectors[prefix] if prefix is not None else None
+
+    def __prefix(self, node_id: str) -> Union[str, None]:
+        """
+        Returns the longest prefix of ```node_id``` a connector is registered with, ```None``` if there is none.
+        """
+        prefixes = [prefix for prefix in self._connectors.keys() if node_id.startswith(prefix)]
+        if len(prefixes) == 0:
+            return None
+
+        return max(prefixes, key=len)
+
+    async def connect(self) -> None:
+        """
+        Connects concurrently all the connectors of the pool that are not connected yet.
+        Connectors failing to connect are logged and left disconnected.
+        """
+        await self.__for_each(lambda conn: conn.connect(), lambda conn: not conn.is_connected, "connecting to")
+
+    async def disconnect(self) -> None:
+        """
+        Disconnects concurrently all the connected connectors of the pool.
+        """
+        await self.__for_each(lambda conn: conn.disconnect(), lambda conn: conn.is_connected, "disconnecting from")
+
+    async def get_many(self, node_ids: List[str]) -> List[Tuple[Union[_ValueType, None], ua.StatusCode]]:
+        """
+        Reads concurrently from each server the values of its ```node_ids``` (see :meth:`OPCUAConnector.get_many`).
+
+        Returns the values and status codes in the same order of ```node_ids```,
+        ```BadCommunicationError``` for those of the servers that could not be read.
+        """
+        groups = self.__group(node_ids)
+        results = await self.__gather(groups, lambda conn, ids: conn.get_many(list(ids.keys())), "reading from")
+
+        values: Dict[str, Tuple[Union[_ValueType, None], ua.StatusCode]] = {}
+        failed = (None, ua.StatusCode(ua.StatusCodes.BadCommunicationError))
+        for ids, result in zip(groups.values(), results):
+            by_id = dict(zip(ids.keys(), result)) if result is not None else {}
+            for stripped, originals in ids.items():
+                values.update((node_id, by_id.get(stripped, failed)) for node_id in originals)
+
+        unknown = (None, ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown))
+        return [values.get(node_id, unknown) for node_id in node_ids]
+
+    async def set_many(self,
+                       values: Dict[str, Tuple[_ValueType, Union[int, None]]]) -> List[ua.StatusCode]:
+        """
+        Writes concurrently to each server its ```values``` (see :meth:`OPCUAConnector.set_many`).
+
+        Returns the status codes in the same order of ```values```,
+        ```BadCommunicationError``` for those of the servers that could not be written.
+        Raises ```TypeError``` if any value does not match the data type of its node.
+        """
+        groups = self.__group(list(values.keys()))
+        results = await self.__gather(
+            groups,
+            lambda conn, ids: conn.set_many({stripped: values[originals[-1]] for stripped, originals in ids.items()}),
+            "writing to")
+
+        statuses: Dict[str, ua.StatusCode] = {}
+        failed = ua.StatusCode(ua.StatusCodes.BadCommunicationError)
+        for ids, result in zip(groups.values(), results):
+            by_id = dict(zip(ids.keys(), result)) if result is not None else {}
+            for stripped, originals in ids.items():
+                statuses.update((node_id, by_id.get(stripped, failed)) for node_id in originals)
+
+        unknown = ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown)
+        return [statuses.get(node_id, unknown) for node_id in values.keys()]
+
+    async def start_subscriptions(self,
+                                  node_ids: List[str],
+                                  subscription_handler: OPCUASubscriptionHandler,
+                                  update_interval: int = 500,
+                                  **options) -> List[str]:
+        """
+        Subscribes concurrently on each server to its ```node_ids```
+        (see :meth:`OPCUAConnector.start_subscriptions` for ```options```).
+
+        Returns the node ids that could not be monitored (all those of the servers failing to subscribe).
+        """
+        groups = self.__group(node_ids)
+        results = await self.__gather(
+            groups,
+            lambda conn, ids: conn.start_subscriptions(list(ids.keys()), subscription_handler,
+                                                       update_interval, **options),
+            "subscribing to")
+
+        routed = {node_id for ids in groups.values() for originals in ids.values() for node_id in originals}
+        failed = [node_id for node_id in node_ids if node_id not in routed]
+        for ids, result in zip(groups.values(), results):
+            failed_ids = ids.keys() if result is None else result
+            failed.extend(node_id for stripped in failed_ids for node_id in ids[stripped])
+
+        return failed
+
+    async def stop_subscriptions(self, node_ids: List[str]) -> None:
+        """
+        Stops concurrently on each server the monitoring of its ```node_ids```.
+        """
+        groups = self.__group(node_ids)
+        await self.__gather(groups, lambda conn, ids: conn.stop_subscriptions(list(ids.keys())), "unsubscribing from")
+
+    def __group(self, node_ids: List[str]) -> Dict[OPCUAConnector, Dict[str, List[str]]]:
+        """
+        Groups ```node_ids``` by the connector they are routed to, logging those without one.
+        The ids of each connector (without the prefix) are mapped to the ```node_ids``` they come from.
+        """
+        groups: Dict[OPCUAConnector, Dict[str, List[str]]] = {}
+        unrouted: List[str] = list()
+        for node_id in node_ids:
+            prefix = self.__prefix(node_id)
+            if prefix is None:
+                unrouted.append(node_id)
+            else:
+                ids = groups.setdefault(self._connectors[prefix], {})
+                ids.setdefault(node_id[len(prefix):], list()).append(node_id)
+
+        if len(unrouted) > 0:
+            logger.error(f"No connector for tags: {unrouted}")
+
+        return groups
+
+    @staticmethod
+    async def __gather(groups: Dict[OPCUAConnector, Dict[str, List[str]]], action, description: str) -> list:
+        """
+        Runs concurrently ```action``` for each connector of ```groups```, the result of those failing is ```None```.
+        ```TypeError``` and ```ValueError``` (i.e., wrong arguments, not server failures) are raised instead.
+        """
+        results = await asyncio.gather(*[action(conn, ids) for conn, ids in groups.items()], return_exceptions=True)
+        for result in results:
+            if isinstance(result, (TypeError, ValueError)):
+                raise result
+        for conn, result in zip(groups.keys(), results):
+            if isinstance(result, Exception):
+                logger.error(f"{type(result)} while {description} {conn.host}.")
+
+        return [None if isinstance(result, Exception) else result for result in results]
+
+    async def __for_each(self, action, condition, description: str) -> None:
+        connectors = [conn for conn in dict.fromkeys(self._connectors.values()) if condition(conn)]
+        results = await asyncio.gather(*[action(conn) for conn in connectors], return_exceptions=True)
+        for conn, result in zip(connectors, results):
+            if isinstance(result, Exception):
+                logger.error(f"{type(result)} while {description} {conn.host}.")
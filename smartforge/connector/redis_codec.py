@@ -0,0 +1,142 @@
+import sys
+from array import array
+from enum import Enum, unique
+from numbers import Integral, Real
+from typing import Callable, Dict, List, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for decoding values as NumPy arrays
+    np = None
+
+_ValueTypeNotNone = Union[bytes, float, int, bool, str]
+_ValueType = Union[_ValueTypeNotNone, None]
+_ArrayType = Union[array, "np.ndarray"]
+
+
+@unique
+class RedisType(Enum):
+    string = 0
+    byte = 1
+    integer = 2
+    float = 3
+    boolean = 4
+
+
+"""
+Booleans are stored as strings (i.e., "True" or "False")
+"""
+_TRUE = frozenset((b"True", b"true", b"1"))
+
+
+def _to_bool(value: bytes) -> bool:
+    return value in _TRUE
+
+
+"""
+Decoders of the values read (int and float parse bytes without decoding them first)
+"""
+_DECODERS: Dict[RedisType, Callable[[bytes], _ValueTypeNotNone]] = {
+    RedisType.string: lambda value: value.decode("utf-8"),
+    RedisType.byte: lambda value: value,
+    RedisType.integer: int,
+    RedisType.float: float,
+    RedisType.boolean: _to_bool,
+}
+
+"""
+Type codes of array.array and little-endian NumPy dtypes, used for packed binary blobs too
+"""
+_ARRAY_TYPECODES = {RedisType.integer: "q", RedisType.float: "d", RedisType.boolean: "b"}
+_NUMPY_DTYPES = {RedisType.integer: "<i8", RedisType.float: "<f8", RedisType.boolean: "|b1"}
+
+
+def _convert_values(values: List[Union[bytes, None]], data_types: List[RedisType]) -> List[_ValueType]:
+    """
+    Converts a list of ```values``` following (in order) the types inside ```data_types```.
+    """
+    return [None if value is None else _DECODERS[data_type](value) for value, data_type in zip(values, data_types)]
+
+
+def _check_array_type(data_type: RedisType, as_numpy: bool) -> None:
+    if data_type not in _ARRAY_TYPECODES:
+        raise ValueError(f"Arrays can only hold integer, float or boolean values, not {data_type}.")
+    if as_numpy and np is None:
+        raise ImportError("NumPy is required for decoding values as NumPy arrays.")
+
+
+def _check_fill_value(fill_value: Union[float, int, bool], data_type: RedisType) -> Union[float, int, bool]:
+    """
+    Returns ```fill_value``` converted to ```data_type```, raising ```ValueError``` if it cannot be represented by it.
+    """
+    if not isinstance(fill_value, Real):
+        raise ValueError(f"The fill value must be a number or a boolean, not {type(fill_value)}.")
+    if data_type is RedisType.integer:
+        if not isinstance(fill_value, Integral) and not float(fill_value).is_integer():
+            raise ValueError(f"The fill value of an integer array must be an integer, not {fill_value}.")
+        return int(fill_value)
+    if data_type is RedisType.float:
+        return float(fill_value)
+    return bool(fill_value)
+
+
+def decode_array(values: List[Union[bytes, None]],
+                 data_type: RedisType,
+                 as_numpy: bool = True,
+                 fill_value: Union[float, int, bool, None] = None) -> _ArrayType:
+    """
+    Converts ```values``` (e.g., as returned by MGET), all of type ```data_type```, into a NumPy array
+    (or an ```array.array``` if not ```as_numpy```) with a single vectorized conversion.
+
+    Missing values are replaced by ```fill_value```, by default NaN for floats, 0 for integers and ```false``` for booleans.
+    ```ValueError``` is raised if ```fill_value``` cannot be converted to ```data_type``` (e.g., 2.5 for integers).
+    """
+    _check_array_type(data_type, as_numpy)
+    if fill_value is None:
+        fill_value = float("nan") if data_type is RedisType.float else 0
+    fill_value = _check_fill_value(fill_value, data_type)
+
+    if None in values:
+        fill = str(fill_value).encode("utf-8")
+        values = [fill if value is None else value for value in values]
+
+    if as_numpy:
+        raw = np.array(values, dtype=np.bytes_)
+        if data_type is RedisType.boolean:
+            return np.isin(raw, list(_TRUE))
+        return raw.astype(_NUMPY_DTYPES[data_type])
+
+    return array(_ARRAY_TYPECODES[data_type], map(_DECODERS[data_type], values))
+
+
+def pack_array(values: Union[Sequence[Union[float, int, bool]], _ArrayType], data_type: RedisType) -> bytes:
+    """
+    Packs ```values``` of type ```data_type``` in a binary blob of little-endian 64 bit
+    integers or floats (one byte per value for booleans).
+    """
+    _check_array_type(data_type, False)
+
+    if np is not None and isinstance(values, np.ndarray):
+        return values.astype(_NUMPY_DTYPES[data_type], copy=False).tobytes()
+
+    packed = array(_ARRAY_TYPECODES[data_type], values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_array(blob: bytes, data_type: RedisType, as_numpy: bool = True) -> _ArrayType:
+    """
+    Unpacks a binary blob created by :func:`pack_array` into a NumPy array
+    (read-only, sharing the memory of ```blob```), or an ```array.array``` if not ```as_numpy```.
+    """
+    _check_array_type(data_type, as_numpy)
+
+    if as_numpy:
+        return np.frombuffer(blob, dtype=_NUMPY_DTYPES[data_type])
+
+    unpacked = array(_ARRAY_TYPECODES[data_type])
+    unpacked.frombytes(blob)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked
@@ -1,40 +1,121 @@
+import copy
 import threading
-from enum import Enum, unique
-from typing import List, Union, Dict
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Sequence, Tuple, Union, Dict
 from ..utils import get_logger
 
-from redis import Redis
+from redis import BlockingConnectionPool, ConnectionPool, Redis
+from redis.client import Pipeline, PubSub
+from redis.exceptions import RedisError, ResponseError
 
-_ValueTypeNotNone = Union[bytes, float, int, bool, str]
-_ValueType = Union[_ValueTypeNotNone, None]
+from .redis_codec import RedisType, _ArrayType, _convert_values, _ValueType, _ValueTypeNotNone, \
+    decode_array, pack_array, unpack_array
 _JsonValueTypeNotNone = Union[float, int, bool, str, dict]
 _JsonValueType = Union[_JsonValueTypeNotNone, None]
+# stream, entry id, fields
+_StreamEntry = Tuple[str, str, Dict[str, _ValueType]]
 
 """
 Logger
 """
 logger = get_logger("RedisConnector")
 
+"""
+Connection pools shared among connectors to the same instance and database
+"""
+_shared_pools: Dict[tuple, ConnectionPool] = {}
+_shared_pools_lock = threading.Lock()
 
-@unique
-class RedisType(Enum):
-    string = 0
-    byte = 1
-    integer = 2
-    float = 3
-    boolean = 4
+
+def _stream_fields(fields: Dict[str, _ValueTypeNotNone]) -> Dict[str, _ValueTypeNotNone]:
+    """
+    Converts the boolean values of ```fields``` to strings, as done by ```set```.
+    """
+    return {field: str(val) if val is True or val is False else val for field, val in fields.items()}
+
+
+def _decode_stream_entries(response: List[Any], data_type: RedisType) -> Tuple[List[_StreamEntry], List[_StreamEntry]]:
+    """
+    Converts the ```response``` of XREADGROUP into entries whose values are of type ```data_type```.
+    Returns the entries and those that were deleted (without fields) before being read.
+    """
+    entries: List[_StreamEntry] = list()
+    deleted: List[_StreamEntry] = list()
+    for stream, stream_entries in response:
+        stream = stream.decode("utf-8")
+        for entry_id, fields in stream_entries:
+            # Pending entries trimmed or deleted are returned without fields ({} or None, depending on the client)
+            if not fields:
+                deleted.append((stream, entry_id.decode("utf-8"), {}))
+                continue
+            names = [name.decode("utf-8") for name in fields.keys()]
+            values = _convert_values(list(fields.values()), [data_type] * len(names))
+            entries.append((stream, entry_id.decode("utf-8"), dict(zip(names, values))))
+
+    return entries, deleted
+
+
+def _group_ids(entries: List[_StreamEntry]) -> Dict[str, List[str]]:
+    """
+    Groups the ids of ```entries``` by stream.
+    """
+    ids: Dict[str, List[str]] = {}
+    for stream, entry_id, _ in entries:
+        ids.setdefault(stream, list()).append(entry_id)
+    return ids
 
 
 class RedisConnector:
     """
     Connector for Redis server instances.
     Support for SET, GET, MSET, MGET operations.
+
+    Commands are sent through a connection pool, hence they can be issued concurrently by many threads.
+    ```lock_protection``` only serializes connecting and disconnecting.
+
+    Reads can be served by a local cache (see ```cache_size```), kept up to date through
+    keyspace notifications: the instance must have them enabled (e.g., `notify-keyspace-events KA`).
     """
-    def __init__(self, host: str, port: int, password: str = "", lock_protection: bool = False) -> None:
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 password: str = "",
+                 lock_protection: bool = False,
+                 max_connections: Union[int, None] = None,
+                 socket_keepalive: bool = True,
+                 shared_pool: bool = False,
+                 connection_pool: Union[ConnectionPool, None] = None,
+                 cache_size: int = 0,
+                 cache_ttl: Union[float, None] = 60.0) -> None:
+        """
+        At most ```max_connections``` connections are opened (no limit if ```None```), when all
+        of them are in use commands wait for one to be released.
+
+        With ```shared_pool``` the connection pool is shared with all the other connectors to the same
+        instance and database having ```shared_pool``` set. Otherwise a pool created by
+        :meth:`RedisConnector.create_pool` can be given as ```connection_pool```.
+
+        With ```cache_size``` greater than 0 the values read by ```get```, ```multiple_get``` and ```json_get```
+        of up to ```cache_size``` keys are cached (least recently used keys are evicted first).
+        A cached value is dropped when its key changes (as notified by the instance) or
+        after ```cache_ttl``` seconds (never if ```None```).
+        """
         logger.info(f"Creating a new RedisConnector connecting to {host}:{port}.")
         self._host = host
         self._port = port
         self._password = password
+        self._max_connections = max_connections
+        self._socket_keepalive = socket_keepalive
+        self._shared_pool = shared_pool
+        self._connection_pool = connection_pool
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        self._cache: Union[_RedisReadCache, None] = None
+        self._listeners: Dict[int, Tuple[threading.Thread, threading.Event]] = {}
+        self._last_listener_id = 0
+        self._db = 0
         self._conn = None
         self._connected = False
         self._lock = threading.Lock()
@@ -56,10 +137,47 @@ class RedisConnector:
             self._release()
             return
         
-        self._conn = Redis(self._host, self._port, db, self._password)
+        if self._connection_pool is not None:
+            pool = self._connection_pool
+        elif self._shared_pool:
+            with _shared_pools_lock:
+                # Connectors with different credentials or limits do not share the same pool
+                key = (self._host, self._port, db, self._password, self._max_connections, self._socket_keepalive)
+                pool = _shared_pools.get(key)
+                if pool is None:
+                    pool = _shared_pools[key] = RedisConnector.create_pool(
+                        self._host, self._port, self._password, db, self._max_connections, self._socket_keepalive)
+        else:
+            pool = RedisConnector.create_pool(
+                self._host, self._port, self._password, db, self._max_connections, self._socket_keepalive)
+
+        self._conn = Redis(connection_pool=pool)
+        # The database of a given pool may differ from ```db```, keyspace notifications are per database
+        self._db = pool.connection_kwargs.get("db", db)
+        if self._cache_size > 0:
+            self.__start_cache()
         self._connected = True
         self._release()
 
+    @staticmethod
+    def create_pool(host: str,
+                    port: int,
+                    password: str = "",
+                    db: int = 0,
+                    max_connections: Union[int, None] = None,
+                    socket_keepalive: bool = True) -> ConnectionPool:
+        """
+        Creates a connection pool to database ```db``` of the Redis instance, which can be given to
+        many connectors. With ```max_connections``` commands wait for a free connection
+        instead of opening more than ```max_connections``` connections.
+        """
+        if max_connections is None:
+            return ConnectionPool(host=host, port=port, db=db, password=password,
+                                  socket_keepalive=socket_keepalive)
+
+        return BlockingConnectionPool(host=host, port=port, db=db, password=password,
+                                      socket_keepalive=socket_keepalive, max_connections=max_connections)
+
     def disconnect(self):
         """
         Closes the connection to the Redis instance.
@@ -70,7 +188,14 @@ class RedisConnector:
             self._release()
             return
         
-        del self._conn
+        for listener_id in list(self._listeners.keys()):
+            self.__stop_listener(listener_id)
+        self._cache = None
+
+        # Pools that may be used by other connectors are left open
+        if self._connection_pool is None and not self._shared_pool:
+            self._conn.connection_pool.disconnect()
+        self._conn = None
         self._connected = False
         self._release()
 
@@ -86,6 +211,143 @@ class RedisConnector:
 
         return conn
 
+    @property
+    def cache_hits(self) -> int:
+        """
+        Returns the number of reads served by the local cache (0 if there is no cache).
+        """
+        return self._cache.hits if self._cache is not None else 0
+
+    @property
+    def cache_misses(self) -> int:
+        """
+        Returns the number of reads that had to be sent to the instance even if the cache is enabled.
+        """
+        return self._cache.misses if self._cache is not None else 0
+
+    def watch_keys(self, keys: List[str], callback: Callable[[Union[str, None]], None]) -> Union[int, None]:
+        """
+        Calls ```callback``` (from a background thread) with the key that changed among ```keys```,
+        as notified by the instance through keyspace notifications (see :class:`RedisConnector`).
+        ```callback``` is called with ```None``` when (re)subscribing, since changes may have been missed.
+
+        Returns the id of the watch, for :meth:`RedisConnector.unwatch_keys`, ```None``` if it is not connected.
+        Watches are stopped on disconnection.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return None
+
+        prefix = f"__keyspace@{self._db}__:"
+        pubsub = conn.pubsub()
+        pubsub.subscribe(*[prefix + key for key in dict.fromkeys(keys)])
+        return self.__start_listener(pubsub, callback, len(dict.fromkeys(keys)), len(prefix))
+
+    def unwatch_keys(self, watch_id: int) -> None:
+        """
+        Stops the watch ```watch_id``` created by :meth:`RedisConnector.watch_keys`.
+        """
+        if watch_id not in self._listeners:
+            logger.warning(f"No watch with id {watch_id}.")
+            return
+
+        self.__stop_listener(watch_id)
+
+    def __start_cache(self) -> None:
+        try:
+            events = self._conn.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+            if "K" not in events:
+                logger.warning("Keyspace notifications are disabled, cached values are dropped only when expired.")
+        except RedisError:
+            pass  # CONFIG is not always allowed, notifications are assumed to be enabled
+
+        cache = self._cache = _RedisReadCache(self._cache_size, self._cache_ttl)
+        prefix = f"__keyspace@{self._db}__:"
+        pubsub = self._conn.pubsub()
+        pubsub.psubscribe(prefix + "*")
+        self.__start_listener(pubsub,
+                              lambda key: cache.clear() if key is None else cache.invalidate(key),
+                              1, len(prefix))
+
+    def __start_listener(self,
+                         pubsub: PubSub,
+                         on_change: Callable[[Union[str, None]], None],
+                         channels: int,
+                         prefix_length: int) -> int:
+        stop = threading.Event()
+        listener = threading.Thread(target=RedisConnector.__listen,
+                                    args=(pubsub, on_change, channels, prefix_length, stop),
+                                    name="RedisConnector", daemon=True)
+        self._last_listener_id += 1
+        self._listeners[self._last_listener_id] = (listener, stop)
+        listener.start()
+        return self._last_listener_id
+
+    def __stop_listener(self, listener_id: int) -> None:
+        listener, stop = self._listeners.pop(listener_id)
+        stop.set()
+        listener.join()
+
+    @staticmethod
+    def __listen(pubsub: PubSub,
+                 on_change: Callable[[Union[str, None]], None],
+                 channels: int,
+                 prefix_length: int,
+                 stop: threading.Event) -> None:
+        try:
+            while not stop.is_set():
+                try:
+                    message = pubsub.get_message(timeout=1.0)
+                except RedisError as exc:
+                    logger.error(f"{type(exc)} while listening to keyspace notifications.")
+                    message = {"type": "error"}
+                    stop.wait(1.0)
+
+                if message is None:
+                    continue
+
+                if message["type"] in ("message", "pmessage"):
+                    key = message["channel"][prefix_length:].decode("utf-8")
+                elif message["type"] == "error" or \
+                        (message["type"] in ("subscribe", "psubscribe") and message["data"] == channels):
+                    # (Re)subscribed to all the channels, changes made in the meantime were not notified
+                    key = None
+                else:
+                    continue
+
+                try:
+                    on_change(key)
+                except Exception as exc:
+                    logger.error(f"{type(exc)} while handling a keyspace notification.")
+        finally:
+            pubsub.close()
+
+    def _invalidate(self, keys: List[str]) -> None:
+        """
+        Drops the cached values of ```keys```, after they have been written by this connector.
+        """
+        cache = self._cache
+        if cache is not None:
+            for key in keys:
+                cache.invalidate(key)
+
+    @staticmethod
+    def __cached_read(cache: "_RedisReadCache", key: str, path: Union[str, None], read: Callable[[], Any]) -> Any:
+        found, value = cache.get(key, path)
+        if found:
+            return value
+
+        token = cache.begin(key)
+        try:
+            value = read()
+        except BaseException:
+            cache.discard(key, token)
+            raise
+        cache.put(key, path, value, token)
+
+        return value
+
     def json_set(self, key: str, val: _JsonValueType, path: str=".") -> None:
         """
         Sets one key-value pair in which the key is ```key``` (a string) and
@@ -105,15 +367,13 @@ class RedisConnector:
         To (re)set the whole dictionary use `key=test` and `path="."`, to (re)set the value `13` 
         (of pair with key `test3`) use `key=test` and `path=".test2.test3"`.
         """
-        self._acquire()
-        if not self._connected:
+        conn = self._conn
+        if conn is None:
             logger.error("Not connected to Redis.")
-            self._release()
             return
 
-        self._conn.json().set(key, path, val)
-
-        self._release()
+        conn.json().set(key, path, val)
+        self._invalidate([key])
 
     def set(self, key: str, val: _ValueTypeNotNone) -> None:
         """
@@ -122,17 +382,16 @@ class RedisConnector:
 
         Boolean values get converted to strings.
         """
-        self._acquire()
-        if not self._connected:
+        conn = self._conn
+        if conn is None:
             logger.error("Not connected to Redis.")
-            self._release()
             return
         
         if val is True or val is False:  # <=> type(val) == bool
-            self._conn.set(key, str(val))
+            conn.set(key, str(val))
         else:
-            self._conn.set(key, val)
-        self._release()
+            conn.set(key, val)
+        self._invalidate([key])
 
     def multiple_set(self, pairs: Dict[str, _ValueTypeNotNone]) -> None:
         """
@@ -141,10 +400,9 @@ class RedisConnector:
 
         Boolean values get converted to strings (side-effect).
         """
-        self._acquire()
-        if not self._connected:
+        conn = self._conn
+        if conn is None:
             logger.error("Not connected to Redis.")
-            self._release()
             return
 
         # Creating a dictionary of the key value pairs
@@ -152,31 +410,8 @@ class RedisConnector:
             if val is True or val is False:  # <=> type(val) == bool
                 pairs[key] = str(val)
         
-        self._conn.mset(pairs)
-        self._release()
-
-    @staticmethod
-    def __convert_values(values: List[Union[bytes, None]], data_types: List[RedisType]) -> List[_ValueType]:
-        """
-        Converts a list of ```values``` following (in order) the types inside ```data_types```.
-        """
-        ret: List[Union[bytes, float, int, bool, str, None]] = list()
-
-        for value, data_type in zip(values, data_types):
-            if value is not None and data_type is not RedisType.byte:
-                decoded = value.decode("utf-8")
-                # if data_type is RedisType.string we're done.
-                if data_type is RedisType.integer:
-                    decoded = int(decoded)
-                elif data_type is RedisType.float:
-                    decoded = float(decoded)
-                elif data_type is RedisType.boolean:
-                    decoded = eval(decoded)
-                ret.append(decoded)
-            else:
-                ret.append(value)
-
-        return ret
+        conn.mset(pairs)
+        self._invalidate(list(pairs.keys()))
 
     def json_get(self, key: str, path: str=".") -> _JsonValueType:
         """
@@ -198,14 +433,35 @@ class RedisConnector:
         To retrieve the whole dictionary use `key=test` and `path="."`, to retrieve the value `13` 
         (of pair with key `test3`) use `key=test` and `path=".test2.test3"`.
         """
-        self._acquire()
-        if not self._connected:
+        conn = self._conn
+        if conn is None:
             logger.error("Not connected to Redis.")
-            self._release()
             return None
 
-        ret = self._conn.json().get(key, path)
-        self._release()
+        cache = self._cache
+        if cache is None:
+            return conn.json().get(key, path)
+
+        ret = self.__cached_read(cache, key, path, lambda: conn.json().get(key, path))
+
+        return ret
+
+    def json_multiple_get(self, keys: List[str], path: str = ".") -> List[_JsonValueType]:
+        """
+        Retrieves the values at ```path``` of ```keys``` with a single JSON.MGET (see :meth:`RedisConnector.json_get`).
+        Missing keys have value ```None```.
+
+        An empty list is returned if the connection to Redis is not established.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return list()
+
+        if len(keys) == 0:
+            return list()
+
+        ret = conn.json().mget(keys, path)
 
         return ret
 
@@ -216,14 +472,18 @@ class RedisConnector:
 
         ```None``` is returned if the connection to Redis is not established.
         """
-        self._acquire()
-        if not self._connected:
+        conn = self._conn
+        if conn is None:
             logger.error("Not connected to Redis.")
-            self._release()
             return None
 
-        ret = RedisConnector.__convert_values([self._conn.get(key)], [data_type])
-        self._release()
+        cache = self._cache
+        if cache is None:
+            value = conn.get(key)
+        else:
+            value = self.__cached_read(cache, key, None, lambda: conn.get(key))
+
+        ret = _convert_values([value], [data_type])
 
         return ret[0]
 
@@ -235,37 +495,499 @@ class RedisConnector:
         ```list()``` (or ```[]```, i.e., an empty list) is returned if the connection 
         to Redis is not established.
         """
-        self._acquire()
-        if not self._connected:
+        conn = self._conn
+        if conn is None:
             logger.error("Not connected to Redis.")
-            self._release()
             return list()
 
         if len(keys) != len(data_types):
             logger.error("Arguments keys and data_types do not have the same number of items.")
-            self._release()
             return list()
 
-        values = self._conn.mget(keys) if len(keys) > 1 else [self._conn.get(keys[0])]
+        cache = self._cache
+        if cache is None:
+            values = conn.mget(keys) if len(keys) > 1 else [conn.get(keys[0])]
+        else:
+            values = self.__cached_multiple_read(conn, cache, keys)
 
-        ret = RedisConnector.__convert_values(values, data_types)
+        ret = _convert_values(values, data_types)
 
-        self._release()
         return ret
 
-    def keys(self, pattern: str = "*") -> List[str]:
+    def multiple_get_array(self,
+                           keys: List[str],
+                           data_type: RedisType,
+                           as_numpy: bool = True,
+                           fill_value: Union[float, int, bool, None] = None) -> Union[_ArrayType, None]:
+        """
+        Retrieves the values associated to ```keys```, all of type ```data_type``` (integer, float or boolean),
+        with a single MGET and converts them at once into a NumPy array (or an ```array.array``` if not ```as_numpy```).
+        Missing values are replaced by ```fill_value``` (see :func:`decode_array`).
+
+        ```None``` is returned if the connection to Redis is not established.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return None
+
+        cache = self._cache
+        if cache is None:
+            values = conn.mget(keys) if len(keys) > 0 else list()
+        else:
+            values = self.__cached_multiple_read(conn, cache, keys)
+
+        return decode_array(values, data_type, as_numpy, fill_value)
+
+    def set_array(self,
+                  key: str,
+                  values: Union[Sequence[Union[float, int, bool]], _ArrayType],
+                  data_type: RedisType) -> None:
+        """
+        Sets ```key``` to ```values``` (of type ```data_type```) packed in a single binary blob
+        (see :func:`pack_array`), to be retrieved with :meth:`RedisConnector.get_array`.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return
+
+        conn.set(key, pack_array(values, data_type))
+        self._invalidate([key])
+
+    def get_array(self, key: str, data_type: RedisType, as_numpy: bool = True) -> Union[_ArrayType, None]:
+        """
+        Retrieves the values of type ```data_type``` packed in ```key``` by :meth:`RedisConnector.set_array`,
+        as a NumPy array (or an ```array.array``` if not ```as_numpy```).
+
+        ```None``` is returned if the key does not exist or the connection to Redis is not established.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return None
+
+        cache = self._cache
+        if cache is None:
+            blob = conn.get(key)
+        else:
+            blob = self.__cached_read(cache, key, None, lambda: conn.get(key))
+
+        return unpack_array(blob, data_type, as_numpy) if blob is not None else None
+
+    @staticmethod
+    def __cached_multiple_read(conn: Redis, cache: "_RedisReadCache", keys: List[str]) -> List[Union[bytes, None]]:
+        values: List[Union[bytes, None]] = list()
+        missing: Dict[str, List[bool]] = {}
+        for key in keys:
+            found, value = cache.get(key, None)
+            values.append(value)
+            if not found and key not in missing:
+                missing[key] = cache.begin(key)
+
+        if len(missing) == 0:
+            return values
+
+        try:
+            read = dict(zip(missing.keys(), conn.mget(list(missing.keys()))))
+        except BaseException:
+            for key, token in missing.items():
+                cache.discard(key, token)
+            raise
+
+        for key, token in missing.items():
+            cache.put(key, None, read[key], token)
+
+        return [read[key] if key in read else value for key, value in zip(keys, values)]
+
+    def stream_add(self,
+                   entries: List[Tuple[str, Dict[str, _ValueTypeNotNone]]],
+                   max_length: Union[int, None] = None,
+                   approximate: bool = True) -> List[str]:
+        """
+        Appends each of ```entries``` (a stream key and the fields of the entry, e.g., `("tag1", {"v": 1.5})`)
+        with XADD, all in a single round trip. Boolean values get converted to strings.
+
+        With ```max_length``` each stream is trimmed to about that many entries (MAXLEN ~),
+        exactly that many if not ```approximate``` (slower).
+
+        Returns the ids of the added entries, an empty list if it is not connected.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return list()
+
+        with conn.pipeline(transaction=False) as pipeline:
+            for stream, fields in entries:
+                pipeline.xadd(stream, _stream_fields(fields), maxlen=max_length, approximate=approximate)
+            ids = pipeline.execute()
+
+        return [entry_id.decode("utf-8") for entry_id in ids]
+
+    def create_stream_group(self, stream: str, group: str, start_id: str = "$") -> bool:
+        """
+        Creates the consumer group ```group``` of ```stream``` (creating the stream too if missing),
+        which will read the entries after ```start_id``` ("$" for only new entries, "0" for all of them).
+
+        Returns ```true``` if the group exists (even if it already existed), ```false``` otherwise.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return False
+
+        try:
+            conn.xgroup_create(stream, group, id=start_id, mkstream=True)
+        except ResponseError as exc:
+            if not str(exc).startswith("BUSYGROUP"):
+                raise
+
+        return True
+
+    def stream_read_group(self,
+                          streams: List[str],
+                          group: str,
+                          consumer: str,
+                          count: int = 100,
+                          block: int = 1000,
+                          data_type: RedisType = RedisType.string,
+                          ack: bool = True) -> Iterator[List[_StreamEntry]]:
+        """
+        Yields blocks of at most ```count``` entries (per stream) read from ```streams``` by ```consumer```
+        as a member of ```group``` (see :meth:`RedisConnector.create_stream_group`). Each entry is a tuple
+        of stream, entry id and fields, whose values are converted to ```data_type```.
+
+        The entries delivered to ```consumer``` but never acknowledged (e.g., before a crash) are yielded first.
+        Then new entries are waited for up to ```block``` milliseconds at a time, until it gets disconnected.
+
+        With ```ack``` a block is acknowledged when the next one is requested, hence entries are processed at least once.
+        Otherwise they must be acknowledged with :meth:`RedisConnector.stream_ack`.
+
+        Nothing is yielded if it is not connected.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return
+
+        # Starting from the pending entries, the last id read of each stream
+        last_ids: Union[Dict[str, str], None] = {stream: "0" for stream in streams}
+        to_ack: List[_StreamEntry] = list()
+        while self._connected:
+            if len(to_ack) > 0:
+                self.__ack(conn, group, to_ack)
+                to_ack = list()
+
+            if last_ids is None:
+                response = conn.xreadgroup(group, consumer, {stream: ">" for stream in streams},
+                                           count=count, block=block)
+            else:
+                response = conn.xreadgroup(group, consumer, last_ids, count=count)
+
+            entries, deleted = _decode_stream_entries(response, data_type)
+            if len(deleted) > 0:
+                # Trimmed before being processed, they cannot be read anymore
+                self.__ack(conn, group, deleted)
+
+            if last_ids is not None:
+                if len(entries) + len(deleted) == 0:
+                    last_ids = None
+                    continue
+                for stream, entry_id, _ in entries + deleted:
+                    last_ids[stream] = entry_id
+
+            if len(entries) == 0:
+                continue
+
+            yield entries
+
+            if ack:
+                to_ack = entries
+
+    def stream_ack(self, group: str, entries: List[_StreamEntry]) -> None:
+        """
+        Acknowledges ```entries``` as processed by ```group``` (see :meth:`RedisConnector.stream_read_group`).
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return
+
+        self.__ack(conn, group, entries)
+
+    @staticmethod
+    def __ack(conn: Redis, group: str, entries: List[_StreamEntry]) -> None:
+        with conn.pipeline(transaction=False) as pipeline:
+            for stream, ids in _group_ids(entries).items():
+                pipeline.xack(stream, group, *ids)
+            pipeline.execute()
+
+    def keys(self, pattern: str = "*", use_scan: bool = False) -> List[str]:
         """
         Retrieves all keys inside the Redis instance, given a ```pattern```.
 
+        With ```use_scan``` the keys are retrieved incrementally (see :meth:`RedisConnector.scan_keys`),
+        instead of with a single KEYS command blocking the server until all keys are checked.
+
         Returns an empty list both if there are no keys and if it is not connected.
         """
-        self._acquire()
-        if not self._connected:
+        conn = self._conn
+        if conn is None:
             logger.error("Not connected to Redis.")
-            self._release()
             return list()
 
-        ret = [key.decode("utf-8") for key in self._conn.keys(pattern)]
+        if use_scan:
+            return list(self.scan_keys(pattern))
+
+        ret = [key.decode("utf-8") for key in conn.keys(pattern)]
 
-        self._release()
         return ret
+
+    def scan_keys(self,
+                  pattern: str = "*",
+                  count: Union[int, None] = None,
+                  type: Union[str, None] = None) -> Iterator[str]:
+        """
+        Yields the keys matching ```pattern``` using SCAN cursors, each call to the server checking
+        about ```count``` keys. If ```type``` is given (e.g., "string", "ReJSON-RL"), only keys of that type are yielded.
+
+        Keys are not returned in order and a key may be yielded more than once
+        if the keyspace changes during the iteration.
+
+        Nothing is yielded if it is not connected.
+        """
+        conn = self._conn
+        if conn is None:
+            logger.error("Not connected to Redis.")
+            return
+
+        for key in conn.scan_iter(match=pattern, count=count, _type=type):
+            yield key.decode("utf-8")
+
+    @contextmanager
+    def batch(self, transaction: bool = False) -> Iterator["RedisBatch"]:
+        """
+        Returns a :class:`RedisBatch` queuing commands that are sent all together, in a single round trip,
+        when the ```with``` block exits (or when ```execute``` is called).
+        If ```transaction``` is set, the commands are executed atomically (MULTI/EXEC).
+
+        For example:
+        `with conn.batch() as b:
+            b.set("a", 1)
+            b.json_set("b", {"c": 2})
+            b.get("a", RedisType.integer)
+        print(b.results)  # [None, None, 1]`
+        """
+        conn = self._conn
+        pipeline = conn.pipeline(transaction=transaction) if conn is not None else None
+        batch = RedisBatch(self, pipeline)
+        yield batch
+        if batch.pending > 0:
+            batch.execute()
+
+
+class RedisBatch:
+    """
+    Commands of a :class:`RedisConnector` queued to be sent in a single round trip
+    (see :meth:`RedisConnector.batch`). Each command adds one item to ```results```:
+    the (converted) value for reads, ```None``` for writes.
+    """
+    def __init__(self,
+                 connector: RedisConnector,
+                 pipeline: Union[Pipeline, None]) -> None:
+        self._connector = connector
+        self._pipeline = pipeline
+        self._decoders: List[Callable[[Any], Any]] = list()
+        self._written: List[str] = list()
+        self._results: List[Any] = list()
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns the number of queued commands.
+        """
+        return len(self._decoders)
+
+    @property
+    def results(self) -> List[Any]:
+        """
+        Returns the results of the last execution, in the same order the commands were queued.
+        """
+        return self._results
+
+    def set(self, key: str, val: _ValueTypeNotNone, expire: Union[int, None] = None) -> None:
+        """
+        Queues the SET of ```key``` to ```val``` (see :meth:`RedisConnector.set`),
+        expiring after ```expire``` seconds if given.
+        """
+        if val is True or val is False:  # <=> type(val) == bool
+            val = str(val)
+        self.__queue(lambda pipe: pipe.set(key, val, ex=expire), RedisBatch.__no_result)
+        self._written.append(key)
+
+    def multiple_set(self, pairs: Dict[str, _ValueTypeNotNone]) -> None:
+        """
+        Queues the MSET of ```pairs``` (see :meth:`RedisConnector.multiple_set`).
+        """
+        to_set = {key: str(val) if val is True or val is False else val for key, val in pairs.items()}
+        self.__queue(lambda pipe: pipe.mset(to_set), RedisBatch.__no_result)
+        self._written.extend(to_set.keys())
+
+    def json_set(self, key: str, val: _JsonValueType, path: str = ".") -> None:
+        """
+        Queues the JSON.SET of ```val``` at ```path``` of ```key``` (see :meth:`RedisConnector.json_set`).
+        """
+        self.__queue(lambda pipe: pipe.json().set(key, path, val), RedisBatch.__no_result)
+        self._written.append(key)
+
+    def expire(self, key: str, seconds: int) -> None:
+        """
+        Queues the expiration of ```key``` after ```seconds``` seconds.
+        """
+        self.__queue(lambda pipe: pipe.expire(key, seconds), RedisBatch.__no_result)
+        self._written.append(key)
+
+    def get(self, key: str, data_type: RedisType) -> None:
+        """
+        Queues the GET of ```key```, converted to ```data_type``` (see :meth:`RedisConnector.get`).
+        """
+        self.__queue(lambda pipe: pipe.get(key), lambda value: _convert_values([value], [data_type])[0])
+
+    def multiple_get(self, keys: List[str], data_types: List[RedisType]) -> None:
+        """
+        Queues the MGET of ```keys```, converted to ```data_types``` (see :meth:`RedisConnector.multiple_get`).
+        """
+        if len(keys) != len(data_types):
+            logger.error("Arguments keys and data_types do not have the same number of items.")
+            return
+        self.__queue(lambda pipe: pipe.mget(keys), lambda values: _convert_values(values, data_types))
+
+    def stream_add(self,
+                   stream: str,
+                   fields: Dict[str, _ValueTypeNotNone],
+                   max_length: Union[int, None] = None,
+                   approximate: bool = True) -> None:
+        """
+        Queues the XADD of an entry with ```fields``` to ```stream``` (see :meth:`RedisConnector.stream_add`),
+        its result is the id of the entry.
+        """
+        to_add = _stream_fields(fields)
+        self.__queue(lambda pipe: pipe.xadd(stream, to_add, maxlen=max_length, approximate=approximate),
+                     lambda entry_id: entry_id.decode("utf-8"))
+
+    def json_get(self, key: str, path: str = ".") -> None:
+        """
+        Queues the JSON.GET of ```path``` of ```key``` (see :meth:`RedisConnector.json_get`).
+        """
+        self.__queue(lambda pipe: pipe.json().get(key, path), lambda value: value)
+
+    def execute(self) -> List[Any]:
+        """
+        Sends all the queued commands in a single round trip and returns their results.
+
+        An empty list is returned if the connector is not connected.
+        """
+        decoders = self._decoders
+        written = self._written
+        self._decoders = list()
+        self._written = list()
+        self._results = list()
+
+        if self._pipeline is None or not self._connector.is_connected:
+            logger.error("Not connected to Redis.")
+            return self._results
+
+        raw_results = self._pipeline.execute()
+        self._connector._invalidate(written)
+        self._results = [decode(result) for decode, result in zip(decoders, raw_results)]
+        return self._results
+
+    def __queue(self, command: Callable[[Pipeline], Any], decoder: Callable[[Any], Any]) -> None:
+        if self._pipeline is not None:
+            command(self._pipeline)
+        self._decoders.append(decoder)
+
+    @staticmethod
+    def __no_result(_) -> None:
+        return None
+
+
+class _RedisReadCache:
+    """
+    Values read from Redis, by key and path (```None``` for plain values), evicted by LRU and TTL.
+    A value read while its key gets invalidated is not cached, since it may be already stale.
+    """
+    def __init__(self, max_keys: int, ttl: Union[float, None]) -> None:
+        self._max_keys = max_keys
+        self._ttl = ttl
+        self._entries: OrderedDict[str, Dict[Union[str, None], Tuple[Any, float]]] = OrderedDict()
+        self._pending: Dict[str, List[List[bool]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, path: Union[str, None]) -> Tuple[bool, Any]:
+        with self._lock:
+            fields = self._entries.get(key)
+            if fields is not None and path in fields:
+                value, expiration = fields[path]
+                if expiration > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+                del fields[path]
+                if len(fields) == 0:
+                    del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def begin(self, key: str) -> List[bool]:
+        """
+        Returns the token to be given to ```put``` (or ```discard```) once the value of ```key``` is read.
+        """
+        token = [True]
+        with self._lock:
+            self._pending.setdefault(key, list()).append(token)
+        return token
+
+    def put(self, key: str, path: Union[str, None], value: Any, token: List[bool]) -> None:
+        with self._lock:
+            self.__end(key, token)
+            if not token[0]:
+                return
+
+            fields = self._entries.get(key)
+            if fields is None:
+                fields = self._entries[key] = {}
+            else:
+                self._entries.move_to_end(key)
+            expiration = time.monotonic() + self._ttl if self._ttl is not None else float("inf")
+            fields[path] = (copy.deepcopy(value) if isinstance(value, (dict, list)) else value, expiration)
+
+            while len(self._entries) > self._max_keys:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str, token: List[bool]) -> None:
+        with self._lock:
+            self.__end(key, token)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            for token in self._pending.get(key, ()):
+                token[0] = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for tokens in self._pending.values():
+                for token in tokens:
+                    token[0] = False
+
+    def __end(self, key: str, token: List[bool]) -> None:
+        tokens = [pending for pending in self._pending[key] if pending is not token]
+        if len(tokens) == 0:
+            del self._pending[key]
+        else:
+            self._pending[key] = tokens
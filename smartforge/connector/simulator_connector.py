@@ -1,22 +1,115 @@
+import asyncio
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, Union
+
 import requests
-from json import loads as json_loads
+from requests.adapters import HTTPAdapter
 from ..utils import get_logger
 
 """
 Logger
 """
-logger = get_logger("OPCUAConnector")
+logger = get_logger("SimulatorConnector")
 
 
 class SimulatorConnector:
-    def __init__(self, host: str) -> None:
+    """
+    Connector for the simulator.
+    Requests are sent through a session keeping the connections open, hence they can be sent concurrently by many threads.
+    """
+    def __init__(self, host: str, timeout: float = 10.0, pool_size: int = 10, cache_ttl: float = 0.0) -> None:
+        """
+        Requests fail if the simulator does not answer within ```timeout``` seconds.
+        At most ```pool_size``` connections are open, when all of them are in use requests wait for one to be released.
+
+        Responses are cached: for ```cache_ttl``` seconds they are returned without sending the request again,
+        then (if the simulator gave them an ETag) they are returned again only if the simulator confirms
+        they did not change.
+        """
         logger.info(f"Creating a new SimulatorConnector connecting to {host}.")
         self._host = host
+        self._timeout = timeout
+        self._cache_ttl = cache_ttl
+        # path -> response, ETag, expiration
+        self._cache: Dict[str, Tuple[dict, Union[str, None], float]] = {}
+        self._cache_lock = threading.Lock()
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
 
     def default_parameters(self) -> dict:
-        response = requests.post(f"{self._host}/default_parameters")
-        if response.ok:
-            return json_loads(response.text)
-        else:
-            logger.error("The request to the simulator did not succeed.")
-            return {}
\ No newline at end of file
+        """
+        Retrieves the default parameters of the simulator.
+
+        An empty dictionary is returned if the request does not succeed.
+        """
+        return self.__post("default_parameters")
+
+    def close(self) -> None:
+        """
+        Closes the connections to the simulator.
+        """
+        self._session.close()
+
+    def __post(self, path: str) -> dict:
+        with self._cache_lock:
+            cached = self._cache.get(path)
+
+        if cached is not None and cached[2] > time.monotonic():
+            return copy.deepcopy(cached[0])
+
+        headers = {"If-None-Match": cached[1]} if cached is not None and cached[1] is not None else {}
+        try:
+            response = self._session.post(f"{self._host}/{path}", headers=headers, timeout=self._timeout)
+            # Not being a GET, a matching If-None-Match may be answered with 412 (Precondition Failed) instead of 304
+            if response.status_code in (304, 412) and cached is not None and cached[1] is not None:
+                value = cached[0]
+            elif response.ok:
+                value = response.json()
+            else:
+                logger.error("The request to the simulator did not succeed.")
+                return {}
+        except (requests.RequestException, ValueError) as exc:
+            logger.error(f"{type(exc)} while sending the request to the simulator.")
+            return {}
+
+        etag = response.headers.get("ETag", cached[1] if cached is not None else None)
+        if self._cache_ttl > 0 or etag is not None:
+            with self._cache_lock:
+                self._cache[path] = (value, etag, time.monotonic() + self._cache_ttl)
+
+        return copy.deepcopy(value)
+
+
+class AsyncSimulatorConnector:
+    """
+    Asyncio connector for the simulator, with the same operations of :class:`SimulatorConnector`.
+    Requests are sent by a pool of ```pool_size``` threads, hence many of them can be in flight
+    at the same time without blocking the event loop.
+    """
+    def __init__(self, host: str, timeout: float = 10.0, pool_size: int = 10, cache_ttl: float = 0.0) -> None:
+        """
+        See :class:`SimulatorConnector` for the parameters.
+        """
+        logger.info(f"Creating a new AsyncSimulatorConnector connecting to {host}.")
+        self._conn = SimulatorConnector(host, timeout, pool_size, cache_ttl)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="AsyncSimulatorConnector")
+
+    async def default_parameters(self) -> dict:
+        """
+        Retrieves the default parameters of the simulator.
+
+        An empty dictionary is returned if the request does not succeed.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._conn.default_parameters)
+
+    def close(self) -> None:
+        """
+        Waits for the requests in flight and closes the connections to the simulator.
+        """
+        self._executor.shutdown()
+        self._conn.close()
@@ -1 +1 @@
-from .logger import get_logger
\ No newline at end of file
+from .logger import get_logger, configure_logging, dropped_log_records
\ No newline at end of file
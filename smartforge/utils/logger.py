@@ -1,7 +1,161 @@
+import atexit
 import logging
+import threading
+import time
 from logging.handlers import QueueHandler, QueueListener
 from os.path import join
-from queue import Queue
+from queue import Empty, Full, Queue
+from typing import Dict, List, Tuple, Union
+
+"""
+Process-wide logging pipeline: loggers only enqueue their records, a single listener thread
+formats them and writes them to the handlers (console and files) of each logger
+"""
+_queue: Queue = Queue(10000)
+_handlers: Dict[str, List[logging.Handler]] = {}
+_handlers_lock = threading.Lock()
+_listener: Union["_SharedQueueListener", None] = None
+_dropped = 0
+_reported_dropped = 0
+
+
+def configure_logging(max_queued_records: int = 10000,
+                      max_repeated_messages: int = 10,
+                      repeat_interval: float = 60.0) -> None:
+    """
+    Sets up the logging pipeline shared by all the loggers.
+
+    At most ```max_queued_records``` records wait to be written (0 means no limit),
+    further records are dropped (and counted, see :func:`dropped_log_records`) instead of blocking the caller.
+
+    The same message of a logger is written at most ```max_repeated_messages``` times every ```repeat_interval```
+    seconds (0 means no limit), the number of suppressed repetitions is added to the next one written.
+    """
+    _queue.maxsize = max(max_queued_records, 0)
+    _rate_limit_filter.configure(max_repeated_messages, repeat_interval)
+
+
+def dropped_log_records() -> int:
+    """
+    Returns the number of records dropped because the logging queue was full.
+    """
+    return _dropped
+
+
+class _RateLimitFilter(logging.Filter):
+    """
+    Lets through at most ```max_repeats``` records with the same logger, level and message every ```interval``` seconds.
+    """
+    def __init__(self, max_repeats: int, interval: float) -> None:
+        super().__init__()
+        self._max_repeats = max_repeats
+        self._interval = interval
+        self._windows: Dict[Tuple[str, int, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, max_repeats: int, interval: float) -> None:
+        with self._lock:
+            self._max_repeats = max_repeats
+            self._interval = interval
+            self._windows.clear()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._max_repeats <= 0:
+            return True
+
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None and now - window[0] < self._interval:
+                window[1] += 1
+                return window[1] <= self._max_repeats
+
+            # Messages built with f-strings may never repeat, hence old windows are forgotten
+            if len(self._windows) >= 1000:
+                self._windows.clear()
+            self._windows[key] = [now, 1]
+
+        suppressed = int(window[1]) - self._max_repeats if window is not None else 0
+        if suppressed > 0:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+
+_rate_limit_filter = _RateLimitFilter(10, 60.0)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """
+    Enqueues records, together with the handlers writing them, without ever blocking.
+    Records not fitting in the queue are dropped and counted.
+    """
+    def __init__(self, queue: Queue, handlers: List[logging.Handler]) -> None:
+        super().__init__(queue)
+        self._handlers = handlers
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _dropped
+        try:
+            self.queue.put_nowait((record, self._handlers))
+        except Full:
+            _dropped += 1
+
+
+class _SharedQueueListener(QueueListener):
+    """
+    Writes each record to the handlers of the logger that enqueued it (i.e., also records propagated
+    from child loggers), reporting the records dropped in the meantime.
+    """
+    def handle(self, item: Tuple[logging.LogRecord, List[logging.Handler]]) -> None:
+        global _reported_dropped
+        record, handlers = item
+
+        dropped = _dropped
+        if dropped > _reported_dropped:
+            report = logging.makeLogRecord({"name": record.name, "levelno": logging.WARNING, "levelname": "WARNING",
+                                            "funcName": "handle",
+                                            "msg": f"{dropped - _reported_dropped} log records dropped (queue full)."})
+            _reported_dropped = dropped
+            _SharedQueueListener.__emit(report, handlers)
+
+        _SharedQueueListener.__emit(record, handlers)
+
+    def enqueue_sentinel(self) -> None:
+        global _dropped
+        # When the queue is full the oldest records are dropped to make room, otherwise stop would wait forever
+        while True:
+            try:
+                self.queue.put_nowait(self._sentinel)
+                return
+            except Full:
+                try:
+                    self.queue.get_nowait()
+                    _dropped += 1
+                except Empty:
+                    pass
+
+    def stop(self) -> None:
+        # Also called when exiting, it may have been stopped already
+        if self._thread is not None:
+            super().stop()
+
+    @staticmethod
+    def __emit(record: logging.LogRecord, handlers) -> None:
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def _start_listener() -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    _listener = _SharedQueueListener(_queue)
+    _listener.start()
+    # Writing the records still queued when exiting
+    atexit.register(_listener.stop)
 
 
 def get_logger(name: str,
@@ -13,25 +167,26 @@ def get_logger(name: str,
     """
     Gets the logger, sets the base level, removes the already available loggers
     and sets only those required by the arguments given to the function.
-    If ```file_normal``` and ```file_critical``` are set, then file logging is set up
-    on a separate thread through a :class:`QueueHandler` and :class:`QueueListener`.
+
+    Records are only enqueued by the logger: console and file logging (if ```file_normal``` and ```file_critical```
+    are set) are done on a single separate thread shared by all the loggers (see :func:`configure_logging`).
     """
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
-    for h in logger.handlers:
+    for h in list(logger.handlers):
         logger.removeHandler(h)
 
     formatter = logging.Formatter(
         "[%(asctime)s] | [%(name)s > %(funcName)s] | %(levelname)s | %(message)s")
 
+    handlers: List[logging.Handler] = list()
+
     if console:
         stream_handler = logging.StreamHandler()
         stream_handler.setFormatter(formatter)
         stream_handler.setLevel(logging.INFO)
-        # This kind of handler is synchronous
-        logger.addHandler(stream_handler)
+        handlers.append(stream_handler)
 
-    # Set up for the asynchronous file loggers
     if file_normal or file_critical:
         folder = log_file_path.strip()
         file_normal_path = f"logs_{name}.log"
@@ -39,28 +194,30 @@ def get_logger(name: str,
         if folder != "":
             file_normal_path = join(folder, file_normal_path)
             file_critical_path = join(folder, file_critical_path)
-        queue = Queue(-1)
-        queue_handler = QueueHandler(queue)
-        logger.addHandler(queue_handler)
 
     if file_normal:
         file_normal_handler = logging.FileHandler(file_normal_path)
         file_normal_handler.setFormatter(formatter)
         file_normal_handler.setLevel(log_level)
+        handlers.append(file_normal_handler)
 
     if file_critical:
         file_critical_handler = logging.FileHandler(file_critical_path)
         file_critical_handler.setFormatter(formatter)
         file_critical_handler.setLevel(logging.ERROR)
-    
-    if file_normal and file_critical:
-        queue_listener = QueueListener(queue, file_critical_handler, file_normal_handler, respect_handler_level=True)
-    elif file_normal:
-        queue_listener = QueueListener(queue, file_normal_handler, respect_handler_level=True)
-    elif file_critical:
-        queue_listener = QueueListener(queue, file_critical_handler, respect_handler_level=True)
+        handlers.append(file_critical_handler)
 
-    if file_normal or file_critical:
-        queue_listener.start()
+    with _handlers_lock:
+        previous = _handlers.get(name, ())
+        _handlers[name] = handlers
+    for h in previous:
+        if isinstance(h, logging.FileHandler):
+            h.close()
+
+    if len(handlers) > 0:
+        queue_handler = _DroppingQueueHandler(_queue, handlers)
+        queue_handler.addFilter(_rate_limit_filter)
+        logger.addHandler(queue_handler)
+        _start_listener()
 
     return logger